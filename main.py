@@ -1,23 +1,27 @@
 import sys
 from PyQt6.QtWidgets import QApplication
 from src.api.auth import AuthManager
+from src.api.cache import CacheManager
+from src.api.store import CacheStore
 from src.api.calendar import CalendarManager
 from src.api.tasks import TaskManager
+from src.core.config import CACHE_DB_FILE
 from src.ui.todo_app import TodoApp
 
 def main():
     """Main entry point for the application."""
-    # Initialize services
-    auth_manager = AuthManager()
-    calendar_manager = CalendarManager(auth_manager)
-    task_manager = TaskManager(auth_manager)
-    
-    # Create and start the application
+    # Create the application first; nothing below touches the network
     app = QApplication(sys.argv)
     
     # Set style to fusion for better appearance
     app.setStyle("Fusion")
     
+    # Credentials, the Google client and its services are loaded by the first API request
+    auth_manager = AuthManager()
+    cache = CacheManager(store=CacheStore(CACHE_DB_FILE))
+    calendar_manager = CalendarManager(auth_manager, cache)
+    task_manager = TaskManager(auth_manager, cache)
+    
     # Create and show main window
     main_window = TodoApp(calendar_manager, task_manager)
     main_window.show()
@@ -2,24 +2,29 @@ import os
 import json
 import logging
 import datetime
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from src.core.config import CREDENTIALS_FILE, TOKEN_FILE, SCOPES
+import threading
+from src.core.config import CREDENTIALS_FILE, TOKEN_FILE, SCOPES, API_HTTP_TIMEOUT_SECONDS
 from datetime import timezone
 
 class AuthManager:
-    """Class to handle Google API authentication."""
+    """Class to handle Google API authentication.
+    Services are handed out per thread, as their httplib2 transport is not thread-safe.
+    Nothing is loaded on construction: the Google libraries are imported and the credentials
+    read on the first request, which the app makes from a worker thread after the window is up."""
     
     def __init__(self):
         """Initialize the authentication manager."""
         self.creds = None
         self.refresh_buffer = 300
-        self.services = {}
-        self.load_credentials()
+        self.creds_lock = threading.RLock()
+        self.thread_services = threading.local()
+        self.credentials_generation = 0
+        self.discovery_documents = {}
         
     def load_credentials(self):
         """Load credentials from the token file."""
+        from google.oauth2.credentials import Credentials
+        
         if os.path.exists(TOKEN_FILE):
             self.creds = Credentials.from_authorized_user_info(
                 json.loads(open(TOKEN_FILE, 'r').read()), 
@@ -36,6 +41,11 @@ class AuthManager:
 
     def refresh_token_if_needed(self):
         """Check if token needs refreshing and refresh it if necessary."""
+        with self.creds_lock:
+            self._refresh_token_if_needed()
+            
+    def _refresh_token_if_needed(self):
+        """Refresh the token while holding creds_lock, so threads do not refresh it at once."""
         if not self.creds:
             self.load_credentials()
             return
@@ -55,35 +65,75 @@ class AuthManager:
         
     def refresh_token(self):
         """Refresh or create new credentials."""
-        try:
-            if self.creds and self.creds.expired and self.creds.refresh_token:
-                self.creds.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, SCOPES)
-                self.creds = flow.run_local_server(port=0)
-                
-            with open(TOKEN_FILE, 'w') as token:
-                token.write(self.creds.to_json())
-                
-            self.services = {}
-            return True
-        except Exception as e:
-            print(f"Error refreshing token: {str(e)}")
-            return False
+        from google.auth.transport.requests import Request
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        
+        with self.creds_lock:
+            try:
+                if self.creds and self.creds.expired and self.creds.refresh_token:
+                    # Refreshed in place, so services built on these credentials stay valid
+                    self.creds.refresh(Request())
+                else:
+                    flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, SCOPES)
+                    self.creds = flow.run_local_server(port=0)
+                    self.credentials_generation += 1
+                    
+                with open(TOKEN_FILE, 'w') as token:
+                    token.write(self.creds.to_json())
+                    
+                return True
+            except Exception as e:
+                print(f"Error refreshing token: {str(e)}")
+                return False
 
     def get_service(self, service_name, version):
-        """Get an authenticated service instance with caching."""
+        """Get the calling thread's service instance, building it on first use.
+        All services of a thread share one keep-alive connection pool and the same credentials."""
         self.refresh_token_if_needed()
         
-        cache_key = f"{service_name}_{version}"
-        if cache_key in self.services:
-            return self.services[cache_key]
+        local = self.thread_services
+        generation = self.credentials_generation
+        if getattr(local, 'generation', None) != generation:
+            local.http = None
+            local.services = {}
+            local.generation = generation
             
-        from googleapiclient.discovery import build
-        service = build(service_name, version, credentials=self.creds)
-        self.services[cache_key] = service
+        cache_key = f"{service_name}_{version}"
+        service = local.services.get(cache_key)
+        if service is None:
+            if local.http is None:
+                local.http = self._authorized_http()
+            service = self._build(service_name, version, local.http)
+            local.services[cache_key] = service
         return service
 
+    def _authorized_http(self):
+        """Create an HTTP transport that signs requests with the shared credentials.
+        httplib2 keeps its connections open between requests, so TLS is negotiated once per host."""
+        import httplib2
+        from google_auth_httplib2 import AuthorizedHttp
+        return AuthorizedHttp(self.creds, http=httplib2.Http(timeout=API_HTTP_TIMEOUT_SECONDS))
+        
+    def _build(self, service_name, version, http):
+        """Build a service on the given transport from its discovery document."""
+        from googleapiclient.discovery import build, build_from_document
+        
+        document = self._discovery_document(service_name, version)
+        if document is None:
+            return build(service_name, version, http=http, static_discovery=False)
+        return build_from_document(document, http=http)
+        
+    def _discovery_document(self, service_name, version):
+        """Get the discovery document bundled with the client library, or None.
+        It is read from disk once for all threads, so building a service needs no network."""
+        from googleapiclient import discovery_cache
+        
+        cache_key = f"{service_name}_{version}"
+        with self.creds_lock:
+            if cache_key not in self.discovery_documents:
+                self.discovery_documents[cache_key] = discovery_cache.get_static_doc(service_name, version)
+            return self.discovery_documents[cache_key]
+
     def get_calendar_service(self):
         """Get an authenticated calendar service instance."""
         return self.get_service('calendar', 'v3')
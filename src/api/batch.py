@@ -0,0 +1,30 @@
+from src.core.config import API_BATCH_LIMIT
+
+def execute_batched(service, requests, limit=API_BATCH_LIMIT):
+    """Execute API requests as HTTP batches of at most limit requests each.
+    Returns a list, in request order, of dicts with 'success' and either 'result' or 'error'."""
+    results = [None] * len(requests)
+
+    def on_response(request_id, response, exception):
+        index = int(request_id)
+        if exception is not None:
+            results[index] = {'success': False, 'error': exception}
+        else:
+            results[index] = {'success': True, 'result': response}
+
+    for chunk_start in range(0, len(requests), limit):
+        chunk = requests[chunk_start:chunk_start + limit]
+        batch = service.new_batch_http_request(callback=on_response)
+        for offset, request in enumerate(chunk):
+            batch.add(request, request_id=str(chunk_start + offset))
+
+        try:
+            batch.execute()
+        except Exception as e:
+            # The whole batch failed in transit; every request without a response failed with it
+            print(f"Error executing batch: {str(e)}")
+            for index in range(chunk_start, chunk_start + len(chunk)):
+                if results[index] is None:
+                    results[index] = {'success': False, 'error': e}
+
+    return results
@@ -1,108 +1,621 @@
+import math
+import bisect
 import threading
-from datetime import datetime
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 import time
-from src.core.utils import parse_event_datetime
-from src.core.models import Task
+from src.core.config import CACHE_MAX_MONTHS, SNAPSHOT_EAGER_MONTHS
+from src.core.utils import normalize_event, generate_id
+from src.api.search import SearchIndex
 
-class CacheManager:
-    """Centralized cache manager for all calendar data."""
+# Events longer than this are kept out of the start-time window scan
+LONG_EVENT_SECONDS = 2 * 24 * 60 * 60
+# Batches with more time index changes than this rebuild the index with one sort instead of bisecting
+TIME_INDEX_BISECT_LIMIT = 32
+
+class CacheChange:
+    """The net effect of one batch of cache writes: added, updated and removed IDs,
+    and the local dates whose task lists changed. IDs dropped from memory by eviction are
+    listed in evicted rather than removed, as they still exist in the store and on the server."""
+    __slots__ = ('added', 'updated', 'removed', 'evicted', 'dates', 'generation')
+    
     def __init__(self):
+        self.added = set()
+        self.updated = set()
+        self.removed = set()
+        self.evicted = set()
+        self.dates = set()
+        self.generation = 0
+        
+    def __bool__(self):
+        return bool(self.added or self.updated or self.removed or self.evicted or self.dates)
+        
+    def record(self, event_id, before, after, evicted=False):
+        """Fold one write into the batch, given the event's record before and after it."""
+        if before is None:
+            self._note_added(event_id)
+        elif after is None and evicted:
+            self._note_evicted(event_id)
+        elif after is None:
+            self._note_removed(event_id)
+        elif event_id not in self.added:
+            self.updated.add(event_id)
+            
+        for record in (before, after):
+            if record is not None and record.summary is not None:
+                day = record.local_date
+                while day <= record.last_date:
+                    self.dates.add(day)
+                    day += timedelta(days=1)
+                    
+    def merge(self, other):
+        """Fold a later batch into this one."""
+        for event_id in other.removed:
+            self._note_removed(event_id)
+        for event_id in other.evicted:
+            self._note_evicted(event_id)
+        for event_id in other.added:
+            self._note_added(event_id)
+        self.updated.update(event_id for event_id in other.updated if event_id not in self.added)
+        self.dates.update(other.dates)
+        self.generation = max(self.generation, other.generation)
+        
+    def _note_added(self, event_id):
+        # Removed and re-added within the batch is an update
+        if event_id in self.removed:
+            self.removed.discard(event_id)
+            self.updated.add(event_id)
+        else:
+            self.evicted.discard(event_id)
+            self.added.add(event_id)
+            
+    def _note_removed(self, event_id):
+        # Added and removed within the batch leaves nothing to report
+        if event_id in self.added:
+            self.added.discard(event_id)
+        else:
+            self.updated.discard(event_id)
+            self.evicted.discard(event_id)
+            self.removed.add(event_id)
+            
+    def _note_evicted(self, event_id):
+        # Loaded and evicted again within the batch leaves nothing to report
+        if event_id in self.added:
+            self.added.discard(event_id)
+        else:
+            self.updated.discard(event_id)
+            self.evicted.add(event_id)
+
+class CacheGeneration:
+    """Immutable, numbered view of the cached tasks, published after each batch of writes.
+    Readers can use one without the lock; writers publish a new generation instead of changing it."""
+    __slots__ = ('number', 'starting_by_month', 'overlapping_by_month')
+    
+    def __init__(self, number, starting_by_month, overlapping_by_month):
+        self.number = number
+        # {month_key: {date: (tasks,)}} by local start date, and by every local date a task overlaps.
+        # A new generation shares the month buckets its writes did not touch with the previous one.
+        self.starting_by_month = starting_by_month
+        self.overlapping_by_month = overlapping_by_month
+        
+    def get_tasks_for_date(self, date):
+        """Get the tasks starting on a date."""
+        return self.starting_by_month.get((date.year, date.month), {}).get(date, ())
+        
+    def get_tasks_by_date(self):
+        """Get every task, keyed by local start date."""
+        return {date: tasks for month in self.starting_by_month.values() for date, tasks in month.items()}
+        
+    def get_tasks_between_dates(self, first_day, last_day):
+        """Get the tasks overlapping each date from first_day to last_day, keyed by date."""
+        result = {}
+        year, month = first_day.year, first_day.month
+        while (year, month) <= (last_day.year, last_day.month):
+            for day, tasks in self.overlapping_by_month.get((year, month), {}).items():
+                if first_day <= day <= last_day:
+                    result[day] = tasks
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return result
+
+class CacheManager:
+    """Centralized cache manager for all calendar data.
+    One instance is shared by the calendar and task managers; entries are tagged with their source."""
+    def __init__(self, store=None, max_months=CACHE_MAX_MONTHS):
         self.events_by_month = {}
         self.tasks_by_date = {}
         self.holidays_by_month = {}
+        self.holiday_years = {}
         self.cache_lock = threading.Lock()
         self.fetched_ranges = set()
         self.event_ids = set()
         self.tasks_by_id = {} 
+        self.event_index = {}
+        self.records = {}
+        self.time_index = []
+        self.time_index_added = set()
+        self.time_index_removed = set()
+        self.day_ids = {}
+        self.long_event_ids = set()
+        self.ids_by_source = {}
+        self.search_index = SearchIndex()
+        self.store = store
+        self.snapshot_months = set()
+        self.deferred_months = []
+        self.snapshot_reconciled = False
+        self.sync_tokens = {}
+        self.max_months = max_months
+        self.month_lru = OrderedDict()
+        self.pinned_months = set()
+        self.listeners = []
+        self.pending_change = None
+        self.evicting = False
+        self.generation = CacheGeneration(0, {}, {})
+        
+        if self.store:
+            self.load_snapshot()
+        
+    def load_snapshot(self):
+        """Populate the cache from the persistent store with the months around today.
+        The other stored months that fit the budget are left for load_deferred_snapshot."""
+        event_months, holidays_by_month, holiday_years, fetched_ranges, sync_tokens = self.store.load()
+        
+        # Rank stored months by distance from today; months beyond the budget would only be evicted
+        today = datetime.now()
+        today_index = today.year * 12 + today.month
+        def distance(month_key):
+            return abs(month_key[0] * 12 + month_key[1] - today_index)
+        ranked_months = sorted(event_months, key=distance)
+        if self.max_months is not None:
+            ranked_months = ranked_months[:self.max_months]
+            
+        loaded = 0
+        with self._writing():
+            self.holidays_by_month.update(holidays_by_month)
+            self.holiday_years.update(holiday_years)
+            self.fetched_ranges.update(fetched_ranges)
+            self.sync_tokens.update(sync_tokens)
+            
+            # Load the farthest first so the nearest months end up most recently used
+            for month_key in reversed(ranked_months):
+                if distance(month_key) <= SNAPSHOT_EAGER_MONTHS:
+                    loaded += self._load_stored_month(month_key)
+            self.deferred_months = [k for k in ranked_months if distance(k) > SNAPSHOT_EAGER_MONTHS]
+            
+        return loaded
+        
+    def load_deferred_snapshot(self):
+        """Load the stored months load_snapshot left out, nearest to today first, one batch per month.
+        Months fetched, reconciled or restored in the meantime are skipped. Returns the number of events loaded."""
+        loaded = 0
+        while True:
+            with self._writing():
+                if not self.deferred_months:
+                    return loaded
+                month_key = self.deferred_months.pop(0)
+                # Reading under the lock keeps writes made meanwhile from being undone by stale rows
+                self.store.flush()
+                loaded += self._load_stored_month(month_key)
+                # Farther months rank below everything used so far
+                if month_key in self.month_lru:
+                    self.month_lru.move_to_end(month_key, last=False)
+                self._evict_over_budget()
+                
+    def _load_stored_month(self, month_key):
+        """Add a stored month's events that are not cached yet while holding the lock.
+        Returns the number of events added."""
+        events, _ = self.store.load_month(*month_key)
+        events = [event for event in events if event.get('id') not in self.event_ids]
+        for event in events:
+            self._add_event_internal(event)
+        if month_key in self.events_by_month and not self.snapshot_reconciled:
+            self.snapshot_months.add(month_key)
+        return len(events)
+        
+    def add_listener(self, callback):
+        """Call callback(change) with a CacheChange after every batch of writes.
+        Callbacks run on the writing thread, after the lock has been released."""
+        with self.cache_lock:
+            self.listeners.append(callback)
+            
+    def remove_listener(self, callback):
+        """Stop calling a callback registered with add_listener."""
+        with self.cache_lock:
+            if callback in self.listeners:
+                self.listeners.remove(callback)
+                
+    @contextmanager
+    def _writing(self):
+        """Hold the lock for one batch of writes, then publish their net change to the listeners."""
+        with self.cache_lock:
+            self.pending_change = CacheChange()
+            try:
+                yield
+            finally:
+                change, self.pending_change = self.pending_change, None
+                self._flush_time_index()
+                if change.dates:
+                    self._publish_generation(change.dates)
+                change.generation = self.generation.number
+                listeners = list(self.listeners)
+                
+        if change:
+            for callback in listeners:
+                try:
+                    callback(change)
+                except Exception as e:
+                    print(f"Error in cache listener: {str(e)}")
+                    
+    def _flush_time_index(self):
+        """Apply the time index changes collected during a batch of writes."""
+        added, removed = self.time_index_added, self.time_index_removed
+        if len(added) + len(removed) <= TIME_INDEX_BISECT_LIMIT:
+            for entry in removed:
+                position = bisect.bisect_left(self.time_index, entry)
+                if position < len(self.time_index) and self.time_index[position] == entry:
+                    del self.time_index[position]
+            for entry in added:
+                bisect.insort(self.time_index, entry)
+        else:
+            if removed:
+                self.time_index = [entry for entry in self.time_index if entry not in removed]
+            # The index is still sorted up to the appended entries, which the sort merges in one pass
+            self.time_index.extend(added)
+            self.time_index.sort()
+        added.clear()
+        removed.clear()
+        
+    def _publish_generation(self, dates):
+        """Publish a new generation that differs from the current one only on the given dates.
+        Only the month buckets holding those dates are copied; the rest are shared."""
+        current = self.generation
+        starting_by_month = dict(current.starting_by_month)
+        overlapping_by_month = dict(current.overlapping_by_month)
+        copied_months = set()
         
+        for day in dates:
+            month_key = (day.year, day.month)
+            if month_key not in copied_months:
+                copied_months.add(month_key)
+                starting_by_month[month_key] = dict(starting_by_month.get(month_key, {}))
+                overlapping_by_month[month_key] = dict(overlapping_by_month.get(month_key, {}))
+                
+            starting = self.tasks_by_date.get(day)
+            if starting:
+                starting_by_month[month_key][day] = tuple(starting.values())
+            else:
+                starting_by_month[month_key].pop(day, None)
+                
+            overlapping = self.day_ids.get(day)
+            if overlapping:
+                ordered_ids = sorted(overlapping, key=lambda event_id: (self.records[event_id].start_ts, event_id))
+                overlapping_by_month[month_key][day] = tuple(self.tasks_by_id[event_id] for event_id in ordered_ids)
+            else:
+                overlapping_by_month[month_key].pop(day, None)
+                
+        for month_key in copied_months:
+            if not starting_by_month[month_key]:
+                del starting_by_month[month_key]
+            if not overlapping_by_month[month_key]:
+                del overlapping_by_month[month_key]
+                
+        self.generation = CacheGeneration(current.number + 1, starting_by_month, overlapping_by_month)
+        
+    def _note_change(self, event_id, before, after):
+        """Record a write in the current batch, if there is one."""
+        if self.pending_change is not None and (before is not None or after is not None):
+            self.pending_change.record(event_id, before, after, evicted=self.evicting)
+        
+    def restore_month(self, year, month):
+        """Reload an evicted month from the persistent store.
+        Returns True if the store held the complete month; it is then treated like snapshot data."""
+        if not self.store:
+            return False
+            
+        # Make sure writes still queued for the month are on disk before reading it back
+        self.store.flush()
+        events, fetched = self.store.load_month(year, month)
+        if not fetched:
+            return False
+            
+        month_key = (year, month)
+        with self._writing():
+            for event in events:
+                self._add_event_internal(event)
+            self.events_by_month.setdefault(month_key, {})
+            self.fetched_ranges.add(month_key)
+            self.snapshot_months.add(month_key)
+            self._cancel_deferred(month_key)
+            self._touch_month(month_key)
+            self._evict_over_budget()
+        return True
+        
+    def pin_months(self, month_keys):
+        """Keep these months (e.g. the visible one) in memory; today's month is always kept."""
+        with self.cache_lock:
+            self.pinned_months = set(month_keys)
+            for month_key in self.pinned_months:
+                if month_key in self.month_lru:
+                    self._touch_month(month_key)
+                    
+    def _touch_month(self, month_key):
+        """Mark a month as most recently used."""
+        self.month_lru[month_key] = None
+        self.month_lru.move_to_end(month_key)
+        
+    def _touch_range(self, start, end):
+        """Mark the cached months between two datetimes as most recently used."""
+        current, last = (start.year, start.month), (end.year, end.month)
+        while current <= last:
+            if current in self.month_lru:
+                self._touch_month(current)
+            current = (current[0] + 1, 1) if current[1] == 12 else (current[0], current[1] + 1)
+            
+    def _evict_over_budget(self):
+        """Evict least recently used months until within max_months, sparing pinned months and today's."""
+        if self.max_months is None or len(self.month_lru) <= self.max_months:
+            return
+            
+        today = datetime.now()
+        pinned = self.pinned_months | {(today.year, today.month)}
+        for month_key in list(self.month_lru):
+            if len(self.month_lru) <= self.max_months:
+                break
+            if month_key not in pinned:
+                self._evict_month_internal(month_key)
+                
+    def _evict_month_internal(self, month_key):
+        """Drop a month from every in-memory index while holding the lock."""
+        self.evicting = True
+        try:
+            for event_id in list(self.events_by_month.pop(month_key, {})):
+                self._delete_event_internal(event_id)
+        finally:
+            self.evicting = False
+        self.fetched_ranges.discard(month_key)
+        self.snapshot_months.discard(month_key)
+        self._cancel_deferred(month_key)
+        self.month_lru.pop(month_key, None)
+        
+    def _cancel_deferred(self, month_key):
+        """Drop a month from the deferred snapshot load, as its cached copy is already current."""
+        if month_key in self.deferred_months:
+            self.deferred_months.remove(month_key)
+            
     def add_event(self, event):
         """Add or update an event in the cache."""
-        with self.cache_lock:
-            self._add_event_internal(event)
+        with self._writing():
+            month_key = self._add_event_internal(event)
+            self._evict_over_budget()
+            if self.store:
+                self.store.save_events([(month_key, event)])
     
     def _add_event_internal(self, event):
-        """Internal method to add an event to the cache while holding the lock."""
-        event_start = parse_event_datetime(event, field='start')
-        month_key = (event_start.year, event_start.month)
+        """Internal method to add an event to the cache while holding the lock.
+        Returns the month key the event was filed under."""
+        event_id = event.get('id') or generate_id()
+        previous = self.records.get(event_id)
+        
+        # The event may have moved to another day, so drop the old copy first
+        if event_id in self.event_index:
+            self._remove_from_indexes(event_id)
+            
+        record = normalize_event(event, event_id)
+        month_key = record.month_key
+        if record.summary is None:
+            self.tasks_by_id.pop(event_id, None)
         
         if month_key not in self.events_by_month:
-            self.events_by_month[month_key] = []
-            
-        event_id = event.get('id')
-        if event_id:
-            self.events_by_month[month_key] = [e for e in self.events_by_month[month_key] 
-                                              if e.get('id') != event_id]
-            self.event_ids.add(event_id)
-            
-        self.events_by_month[month_key].append(event)
-        
-        if event_id and event_id not in self.tasks_by_id:
-            task = self._convert_event_to_task(event)
-            if task:
-                self.tasks_by_id[event_id] = task
-        elif event_id and event_id in self.tasks_by_id:
-            task = self._convert_event_to_task(event)
-            if task:
-                self.tasks_by_id[event_id] = task
-        else:
-            task = self._convert_event_to_task(event)
+            self.events_by_month[month_key] = {}
+        self.events_by_month[month_key][event_id] = event
+        self._touch_month(month_key)
+        self.event_ids.add(event_id)
+        self.records[event_id] = record
+        self.ids_by_source.setdefault(record.source, set()).add(event_id)
         
-        if task:
-            if 'date' in event.get('start', {}):
-                local_date = datetime.fromisoformat(event['start']['date']).date()
-            else:
-                local_date = task.start_dt.astimezone().date()
-                
+        # A fresh Task replaces the old one in every index, so published generations never change
+        local_date = None
+        if record.summary is not None:
+            task = record.to_task()
+            self.tasks_by_id[event_id] = task
+            
+            local_date = record.local_date
             if local_date not in self.tasks_by_date:
-                self.tasks_by_date[local_date] = []
-                
-            self.tasks_by_date[local_date] = [t for t in self.tasks_by_date[local_date] 
-                                            if getattr(t, 'task_id', None) != event_id]
+                self.tasks_by_date[local_date] = {}
+            self.tasks_by_date[local_date][event_id] = task
+            self.search_index.add(event_id, record.summary)
             
-            self.tasks_by_date[local_date].append(task)
+            day = local_date
+            while day <= record.last_date:
+                self.day_ids.setdefault(day, set()).add(event_id)
+                day += timedelta(days=1)
+            
+        self.event_index[event_id] = (month_key, local_date)
+        entry = (record.start_ts, event_id)
+        if entry in self.time_index_removed:
+            self.time_index_removed.discard(entry)
+        else:
+            self.time_index_added.add(entry)
+        if record.end_ts - record.start_ts > LONG_EVENT_SECONDS:
+            self.long_event_ids.add(event_id)
+        self._note_change(event_id, previous, record)
+        return month_key
     
     def add_events(self, events):
         """Add multiple events to the cache at once."""
         if not events:
             return
             
-        with self.cache_lock:
-            for event in events:
-                self._add_event_internal(event)
+        with self._writing():
+            keyed_events = [(self._add_event_internal(event), event) for event in events]
+            self._evict_over_budget()
+            if self.store:
+                self.store.save_events(keyed_events)
     
     def delete_event(self, event_id):
         """Delete an event from all caches."""
-        with self.cache_lock:
-            for month_key, events_list in list(self.events_by_month.items()):
-                self.events_by_month[month_key] = [e for e in events_list if e.get('id') != event_id]
+        with self._writing():
+            self._delete_event_internal(event_id)
+            if self.store:
+                self.store.delete_events([event_id])
+                
+    def _delete_event_internal(self, event_id):
+        """Internal method to delete an event while holding the lock."""
+        self._note_change(event_id, self.records.get(event_id), None)
+        self._remove_from_indexes(event_id)
+        self.tasks_by_id.pop(event_id, None)
+        self.event_ids.discard(event_id)
+        self.search_index.remove(event_id)
+        
+    def _remove_from_indexes(self, event_id):
+        """Drop an event from its month and date buckets using the reverse index."""
+        location = self.event_index.pop(event_id, None)
+        if not location:
+            return
             
-            for date, tasks_list in list(self.tasks_by_date.items()):
-                self.tasks_by_date[date] = [t for t in tasks_list if getattr(t, 'task_id', None) != event_id]
+        month_key, local_date = location
+        
+        record = self.records.pop(event_id, None)
+        if record:
+            self.ids_by_source.get(record.source, set()).discard(event_id)
+            if local_date is not None:
+                day = local_date
+                while day <= record.last_date:
+                    day_ids = self.day_ids.get(day)
+                    if day_ids is not None:
+                        day_ids.discard(event_id)
+                        if not day_ids:
+                            del self.day_ids[day]
+                    day += timedelta(days=1)
+            entry = (record.start_ts, event_id)
+            if entry in self.time_index_added:
+                self.time_index_added.discard(entry)
+            else:
+                self.time_index_removed.add(entry)
+        self.long_event_ids.discard(event_id)
+        
+        month_events = self.events_by_month.get(month_key)
+        if month_events is not None:
+            month_events.pop(event_id, None)
+            
+        date_tasks = self.tasks_by_date.get(local_date)
+        if date_tasks is not None:
+            date_tasks.pop(event_id, None)
+            if not date_tasks:
+                del self.tasks_by_date[local_date]
+        
+    def apply_delta(self, upserts, deleted_ids, loaded_months=()):
+        """Apply a batch of changed and deleted events in a single update.
+        Months in loaded_months are recorded as fully fetched, even if empty."""
+        with self._writing():
+            for event_id in deleted_ids:
+                self._delete_event_internal(event_id)
+                
+            keyed_events = [(self._add_event_internal(event), event) for event in upserts]
+                
+            for month_key in loaded_months:
+                self.events_by_month.setdefault(month_key, {})
+                self.fetched_ranges.add(month_key)
+                self.snapshot_months.discard(month_key)
+                self._cancel_deferred(month_key)
+                self._touch_month(month_key)
+            self._evict_over_budget()
+                
+            if self.store:
+                self.store.delete_events(deleted_ids)
+                self.store.save_events(keyed_events)
+                for year, month in loaded_months:
+                    self.store.mark_range_fetched(year, month)
+                    
+    def invalidate_source(self, source, keep_ids=()):
+        """Drop every cached entry from a source except keep_ids, e.g. after a full listing.
+        Returns the IDs that were dropped."""
+        keep_ids = set(keep_ids)
+        with self._writing():
+            stale_ids = [event_id for event_id in self.ids_by_source.get(source, ()) if event_id not in keep_ids]
+            for event_id in stale_ids:
+                self._delete_event_internal(event_id)
+            if self.store:
+                self.store.delete_events(stale_ids)
+        return stale_ids
+        
+    def get_event_ids_between(self, first_month, last_month, source='calendar'):
+        """Get the IDs of events of a source filed from first_month to last_month, inclusive,
+        whether held in memory or only in the persistent store."""
+        with self.cache_lock:
+            event_ids = set(event_id for key, events in self.events_by_month.items() if first_month <= key <= last_month
+                            for event_id, e in events.items() if e.get('source', 'calendar') == source)
+            if self.store:
+                # Evicted and not yet loaded months are only on disk
+                self.store.flush()
+                event_ids.update(self.store.load_event_ids(first_month, last_month, source))
+            return event_ids
+                       
+    def get_sync_token(self, calendar_id):
+        """Get the stored incremental sync token for a calendar."""
+        with self.cache_lock:
+            return self.sync_tokens.get(calendar_id)
             
-            if event_id in self.tasks_by_id:
-                del self.tasks_by_id[event_id]
+    def set_sync_token(self, calendar_id, token):
+        """Store (or clear, when token is None) the sync token for a calendar."""
+        with self.cache_lock:
+            if token:
+                self.sync_tokens[calendar_id] = token
+            else:
+                self.sync_tokens.pop(calendar_id, None)
+            if self.store:
+                self.store.save_sync_token(calendar_id, token)
+        
+    def replace_month(self, year, month, events):
+        """Reconcile a month with a fresh full fetch of its calendar events.
+        Calendar events no longer present are dropped; tasks are left alone."""
+        month_key = (year, month)
+        fresh_ids = set(event.get('id') for event in events if event.get('id'))
+        
+        with self._writing():
+            stale_ids = [event_id for event_id, e in self.events_by_month.get(month_key, {}).items()
+                         if e.get('source', 'calendar') == 'calendar' and event_id not in fresh_ids]
+            for event_id in stale_ids:
+                self._delete_event_internal(event_id)
                 
-            self.event_ids.discard(event_id)
+            keyed_events = [(self._add_event_internal(event), event) for event in events]
+            self.events_by_month.setdefault(month_key, {})
+            self.fetched_ranges.add(month_key)
+            self.snapshot_months.discard(month_key)
+            self._cancel_deferred(month_key)
+            self._touch_month(month_key)
+            self._evict_over_budget()
+            
+            if self.store:
+                self.store.delete_events(stale_ids)
+                self.store.save_events(keyed_events)
+                self.store.mark_range_fetched(year, month)
     
     def clear_month(self, year, month):
         """Clear the cache for a specific month."""
         month_key = (year, month)
-        with self.cache_lock:
+        with self._writing():
             if month_key in self.events_by_month:
-                for event in self.events_by_month[month_key]:
-                    event_id = event.get('id')
-                    self.event_ids.discard(event_id)
-                    if event_id in self.tasks_by_id:
-                        del self.tasks_by_id[event_id]
+                for event_id in list(self.events_by_month[month_key]):
+                    self._delete_event_internal(event_id)
                 del self.events_by_month[month_key]
+            self.month_lru.pop(month_key, None)
                 
             if month_key in self.holidays_by_month:
                 del self.holidays_by_month[month_key]
-                
-            self.tasks_by_date = {date: tasks for date, tasks in self.tasks_by_date.items() 
-                                 if date.year != year or date.month != month}
+            self.holiday_years.pop(year, None)
                 
             self.fetched_ranges.discard(month_key)
+            self.snapshot_months.discard(month_key)
+            self._cancel_deferred(month_key)
+            
+            if self.store:
+                self.store.clear_month(year, month)
+            
+    def evict_month(self, year, month):
+        """Drop a month from memory only; the persistent store keeps its copy."""
+        with self._writing():
+            self._evict_month_internal((year, month))
             
     def has_event_id(self, event_id):
         """Check if an event ID exists in the cache."""
@@ -113,20 +626,81 @@ class CacheManager:
         """Get all events for a specific month."""
         month_key = (year, month)
         with self.cache_lock:
-            return self.events_by_month.get(month_key, [])[:]
+            if month_key in self.month_lru:
+                self._touch_month(month_key)
+            return list(self.events_by_month.get(month_key, {}).values())
+    
+    def get_generation(self):
+        """Get the latest published generation; reading it needs no lock."""
+        return self.generation
     
     def get_tasks_for_date(self, date):
         """Get all tasks for a specific date."""
+        return list(self.generation.get_tasks_for_date(date))
+    
+    def get_events_between(self, start, end):
+        """Get the cached events starting within [start, end], ordered by start."""
+        with self.cache_lock:
+            self._touch_range(start, end)
+            lo = bisect.bisect_left(self.time_index, (start.timestamp(),))
+            hi = bisect.bisect_left(self.time_index, (math.nextafter(end.timestamp(), math.inf),))
+            return [self.events_by_month[self.event_index[event_id][0]][event_id]
+                    for _, event_id in self.time_index[lo:hi]]
+    
+    def get_tasks_between(self, start, end):
+        """Get the tasks overlapping [start, end], organized by local date.
+        Multi-day events are listed under every day they overlap."""
+        with self.cache_lock:
+            self._touch_range(start, end)
+            return self._tasks_between_internal(start, end)
+            
+    def _tasks_between_internal(self, start, end):
+        """Collect the tasks overlapping [start, end] by local date while holding the lock."""
+        start_ts, end_ts = start.timestamp(), end.timestamp()
+        first_query_day = start.astimezone().date()
+        last_query_day = end.astimezone().date()
+        result = {}
+        
+        lo = bisect.bisect_left(self.time_index, (start_ts - LONG_EVENT_SECONDS,))
+        hi = bisect.bisect_left(self.time_index, (math.nextafter(end_ts, math.inf),))
+        candidates = [event_id for _, event_id in self.time_index[lo:hi] 
+                      if event_id not in self.long_event_ids]
+        candidates.extend(self.long_event_ids)
+        
+        for event_id in candidates:
+            task = self.tasks_by_id.get(event_id)
+            if not task:
+                continue
+                
+            record = self.records[event_id]
+            if record.start_ts > end_ts or (record.end_ts <= start_ts and record.start_ts < start_ts):
+                continue
+                
+            day = max(record.local_date, first_query_day)
+            last_day = min(record.last_date, last_query_day)
+            while day <= last_day:
+                result.setdefault(day, []).append(task)
+                day += timedelta(days=1)
+                
+        return result
+    
+    def get_tasks_by_date(self):
+        """Get every cached task, organized by date."""
+        return {date: list(tasks) for date, tasks in self.generation.get_tasks_by_date().items()}
+    
+    def search_ids(self, term):
+        """Get the IDs of cached tasks whose summary contains term."""
         with self.cache_lock:
-            return self.tasks_by_date.get(date, [])[:]
+            return self.search_index.search(term)
     
-    def get_tasks_for_month(self, year, month):
-        """Get all tasks for a specific month, organized by date."""
+    def get_matching_tasks_by_date(self, term):
+        """Get the tasks whose summary contains term, organized by date."""
         result = {}
         with self.cache_lock:
-            for date, tasks in self.tasks_by_date.items():
-                if date.year == year and date.month == month:
-                    result[date] = tasks[:]
+            for event_id in self.search_index.search(term):
+                local_date = self.event_index[event_id][1]
+                if local_date is not None:
+                    result.setdefault(local_date, []).append(self.tasks_by_id[event_id])
         return result
     
     def get_all_tasks(self):
@@ -134,7 +708,7 @@ class CacheManager:
         all_tasks = []
         with self.cache_lock:
             for tasks in self.tasks_by_date.values():
-                all_tasks.extend(tasks)
+                all_tasks.extend(tasks.values())
         return all_tasks
     
     def get_holidays_for_month(self, year, month):
@@ -148,36 +722,62 @@ class CacheManager:
         month_key = (year, month)
         with self.cache_lock:
             self.holidays_by_month[month_key] = holidays
+            if self.store:
+                self.store.save_holidays(year, month, holidays)
+    
+    def add_holiday_year(self, year, holidays, fetched_at=None):
+        """Replace the holidays of a whole year, given as {date: name}.
+        Months without holidays are cached as empty, so they are not fetched again."""
+        if fetched_at is None:
+            fetched_at = time.time()
+            
+        with self.cache_lock:
+            for month in range(1, 13):
+                self.holidays_by_month[(year, month)] = {}
+            for day, name in holidays.items():
+                self.holidays_by_month[(year, day.month)][day] = name
+            self.holiday_years[year] = fetched_at
+            
+            if self.store:
+                self.store.save_holiday_year(year, holidays, fetched_at)
+                
+    def holidays_are_fresh(self, year, ttl_seconds):
+        """Check whether a year's holidays were fetched less than ttl_seconds ago."""
+        with self.cache_lock:
+            fetched_at = self.holiday_years.get(year)
+        return fetched_at is not None and time.time() - fetched_at < ttl_seconds
     
     def month_is_cached(self, year, month):
-        """Check if a month's data is already cached."""
+        """Check if a month's data is cached in full, not just events picked up by other listings."""
         month_key = (year, month)
         with self.cache_lock:
-            return month_key in self.events_by_month
+            return month_key in self.fetched_ranges and month_key in self.events_by_month
     
     def mark_range_fetched(self, year, month):
         """Mark a date range as having been fetched."""
         month_key = (year, month)
         with self.cache_lock:
             self.fetched_ranges.add(month_key)
+            if self.store:
+                self.store.mark_range_fetched(year, month)
+    
+    def get_snapshot_months(self):
+        """Get the months restored from disk that have not been reconciled yet."""
+        with self.cache_lock:
+            return sorted(self.snapshot_months)
+            
+    def mark_snapshot_reconciled(self):
+        """Record that every restored month, and every month still waiting in the store, is up to date."""
+        with self.cache_lock:
+            self.snapshot_months.clear()
+            self.snapshot_reconciled = True
     
     def get_task_by_id(self, event_id):
         """Get a task by its event ID."""
         with self.cache_lock:
             return self.tasks_by_id.get(event_id)
     
-    def _convert_event_to_task(self, event):
-        """Convert a Google Calendar event to a Task object."""
-        try:
-            start_dt = parse_event_datetime(event, field='start')
-            end_dt = parse_event_datetime(event, field='end')
-            source = event.get('source', 'calendar')
-            isAllDay = event.get('isAllDay', False)
-            
-            if 'date' in event.get('start', {}) and 'date' in event.get('end', {}):
-                isAllDay = True
-                
-            return Task(event['summary'], start_dt, end_dt, task_id=event.get('id'), source=source, isAllDay=isAllDay)
-        except Exception as e:
-            print(f"Error converting event to task: {str(e)}")
-            return None 
\ No newline at end of file
+    def get_record(self, event_id):
+        """Get the normalised record of a cached event."""
+        with self.cache_lock:
+            return self.records.get(event_id)
\ No newline at end of file
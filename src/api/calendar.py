@@ -1,22 +1,36 @@
-import threading
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from src.core.utils import format_date, format_time, generate_id, format_iso_for_api, parse_iso_from_api, parse_event_datetime
-from src.core.config import DEFAULT_CALENDAR_ID, API_MAX_RESULTS
+from src.core.config import (
+    DEFAULT_CALENDAR_ID, API_FIRST_PAGE_SIZE, API_PAGE_SIZE_MAX, CACHE_DB_FILE,
+    INCREMENTAL_SYNC, SYNC_WINDOW_MONTHS_BACK, SYNC_WINDOW_MONTHS_AHEAD, API_FETCH_CONCURRENCY,
+    HOLIDAY_CALENDAR_ID, HOLIDAY_YEARS_AHEAD, HOLIDAY_TTL_DAYS
+)
 from src.api.cache import CacheManager
+from src.api.store import CacheStore
+from src.api.inflight import SingleFlight
+from src.api.batch import execute_batched
+from src.api.payload import execute_list
 
 class CalendarManager:
     """Manages Google Calendar events with local caching."""
     
-    def __init__(self, auth_manager):
-        """Initialize with an auth manager."""
+    def __init__(self, auth_manager, cache=None, fetch_concurrency=API_FETCH_CONCURRENCY):
+        """Initialize with an auth manager and the cache shared with the task manager."""
         self.auth_service = auth_manager
-        self.service = self.auth_service.get_calendar_service()
-        self.cache = CacheManager()
-        self.fetch_lock = threading.Lock()
-        self.fetching_ranges = set()
+        self.cache = cache if cache is not None else CacheManager(store=CacheStore(CACHE_DB_FILE))
+        self.inflight = SingleFlight()
+        self.fetch_concurrency = max(1, fetch_concurrency)
+        self.fetch_executor = ThreadPoolExecutor(max_workers=self.fetch_concurrency, 
+                                                 thread_name_prefix="CalendarFetch")
         
-    def fetch_events(self, calendar_id=DEFAULT_CALENDAR_ID, max_results=API_MAX_RESULTS, page_token=None, 
-                     start_date=None, end_date=None):
+    @property
+    def service(self):
+        """The calendar service for the calling thread, from the auth manager's per-thread pool."""
+        return self.auth_service.get_service('calendar', 'v3')
+        
+    def fetch_events(self, calendar_id=DEFAULT_CALENDAR_ID, max_results=API_FIRST_PAGE_SIZE, page_token=None, 
+                     start_date=None, end_date=None, raise_errors=False):
         """Fetch events from Google Calendar with pagination support."""
         self._ensure_valid_token()
         
@@ -43,7 +57,7 @@ class CalendarManager:
             params['pageToken'] = page_token
         
         try:
-            events_result = self.service.events().list(**params).execute()
+            events_result = execute_list(self.service.events(), 'events', **params)
             
             events = events_result.get('items', [])
             next_token = events_result.get('nextPageToken')
@@ -51,8 +65,23 @@ class CalendarManager:
             return events, next_token
         except Exception as e:
             print(f"Error fetching events: {str(e)}")
+            if raise_errors:
+                raise
             return [], None
     
+    def load_events_page(self, calendar_id=DEFAULT_CALENDAR_ID, max_results=API_FIRST_PAGE_SIZE, page_token=None,
+                         start_date=None, end_date=None):
+        """Fetch a page of events and merge it into the cache on the calling thread.
+        Returns tuple of (events, next_page_token), like fetch_events."""
+        events, next_token = self.fetch_events(calendar_id, max_results, page_token, start_date, end_date)
+        
+        # Listed events win over cached copies, snapshot ones included; deletions arrive as cancelled
+        if events:
+            upserts = [event for event in events if event.get('status') != 'cancelled']
+            deleted_ids = [event.get('id') for event in events if event.get('status') == 'cancelled']
+            self.cache.apply_delta(upserts, deleted_ids)
+        return events, next_token
+    
     def _get_month_date_range(self, year, month):
         """Calculate start and end dates for a given month."""
         start_date = datetime.datetime(year, month, 1, tzinfo=datetime.timezone.utc)
@@ -67,7 +96,7 @@ class CalendarManager:
         start_date, end_date = self._get_month_date_range(year, month)
         return self.fetch_events_for_range(start_date, end_date, calendar_id)
     
-    def get_events_for_month_with_pagination(self, year, month, calendar_id=DEFAULT_CALENDAR_ID, max_results=API_MAX_RESULTS, page_token=None):
+    def get_events_for_month_with_pagination(self, year, month, calendar_id=DEFAULT_CALENDAR_ID, max_results=API_FIRST_PAGE_SIZE, page_token=None):
         """Get events for a specific month with pagination support.
         Returns tuple of (events, next_page_token)."""
         start_date, end_date = self._get_month_date_range(year, month)
@@ -92,7 +121,6 @@ class CalendarManager:
         """Ensure the token is valid before making API calls."""
         try:
             self.auth_service.refresh_token_if_needed()
-            self.service = self.auth_service.get_calendar_service()
         except Exception as e:
             print(f"Error ensuring valid token: {str(e)}")
 
@@ -103,69 +131,62 @@ class CalendarManager:
         if isinstance(end_date, str):
             end_date = parse_iso_from_api(end_date)
         
-        range_id = (calendar_id, start_date.isoformat(), end_date.isoformat())
-        
-        with self.fetch_lock:
-            if range_id in self.fetching_ranges:
-                return []
-            self.fetching_ranges.add(range_id)
-        
         try:
             self._ensure_valid_token()
             month_keys = self._get_month_keys_in_range(start_date, end_date)
             
-            all_cached = all(self.cache.month_is_cached(*month_key) for month_key in month_keys)
-            if all_cached:
-                return [event for month_key in month_keys 
-                       for event in self.cache.get_events_for_month(*month_key) 
-                       if start_date <= parse_event_datetime(event, field='start') <= end_date]
-            
-            cached_events = [event for month_key in month_keys 
-                            if self.cache.month_is_cached(*month_key)
-                            for event in self.cache.get_events_for_month(*month_key)
-                            if start_date <= parse_event_datetime(event, field='start') <= end_date]
-            
+            # Months already being fetched by another caller are waited on, not refetched
             uncached_months = [m for m in month_keys if not self.cache.month_is_cached(*m)]
-            new_events = []
+            # Months evicted from memory are reloaded from disk rather than the network
+            uncached_months = [m for m in uncached_months if not self.cache.restore_month(*m)]
+            owned_keys, inflight_fetches = self.inflight.claim([(calendar_id, m) for m in uncached_months])
             
-            for month_key in uncached_months:
-                year, month = month_key
-                month_start, month_end = self._get_month_date_range(year, month)
-                
-                fetch_start = max(month_start, start_date)
-                fetch_end = min(month_end, end_date)
-                
-                month_events = []
-                next_token = None
+            try:
+                self._fetch_months(calendar_id, [month_key for _, month_key in owned_keys], start_date, end_date)
+            finally:
+                self.inflight.resolve(owned_keys)
                 
-                while True:
-                    batch, next_token = self.fetch_events(
-                        calendar_id=calendar_id,
-                        max_results=API_MAX_RESULTS,
-                        page_token=next_token,
-                        start_date=fetch_start,
-                        end_date=fetch_end
-                    )
-                    if not batch:
-                        break
-                    month_events.extend(batch)
-                    if not next_token:
-                        break
-                
-                self.cache.add_events(month_events)
-                self.cache.mark_range_fetched(year, month)
-                new_events.extend(month_events)
+            for future in inflight_fetches:
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Error in shared fetch: {str(e)}")
             
-            existing_ids = set(event.get('id') for event in cached_events if event.get('id'))
-            return cached_events + [event for event in new_events 
-                                  if event.get('id') and event.get('id') not in existing_ids]
+            return self.cache.get_events_between(start_date, end_date)
             
         except Exception as e:
             print(f"Error fetching events for range: {str(e)}")
             return []
-        finally:
-            with self.fetch_lock:
-                self.fetching_ranges.discard(range_id)
+            
+    def _fetch_months(self, calendar_id, month_keys, start_date, end_date):
+        """Fetch the given months of a range, in parallel when there are several."""
+        fetch_jobs = []
+        for year, month in month_keys:
+            month_start, month_end = self._get_month_date_range(year, month)
+            fetch_jobs.append(((year, month), max(month_start, start_date), min(month_end, end_date)))
+            
+        if len(fetch_jobs) > 1:
+            futures = [(month_key, self.fetch_executor.submit(self._fetch_all_pages, calendar_id, fetch_start, fetch_end))
+                       for month_key, fetch_start, fetch_end in fetch_jobs]
+            results = []
+            for month_key, future in futures:
+                try:
+                    results.append((month_key, future.result()))
+                except Exception as e:
+                    print(f"Error fetching events for {month_key}: {str(e)}")
+        else:
+            results = [(month_key, self._fetch_all_pages(calendar_id, fetch_start, fetch_end))
+                       for month_key, fetch_start, fetch_end in fetch_jobs]
+        
+        # Merge every fetched month into the cache in one batched write
+        if results:
+            fetched_events = [event for _, month_events in results for event in month_events]
+            self.cache.apply_delta(fetched_events, [], loaded_months=[month_key for month_key, _ in results])
+    
+    def _offset_month(self, year, month, offset):
+        """Get the month key (year, month) offset months away from a month."""
+        year, month_index = divmod(year * 12 + month - 1 + offset, 12)
+        return year, month_index + 1
     
     def _get_month_keys_in_range(self, start_date, end_date):
         """Generate all month keys (year, month) in a date range."""
@@ -182,6 +203,132 @@ class CalendarManager:
         
         return month_keys
     
+    def _fetch_all_pages(self, calendar_id, start_date, end_date):
+        """Fetch every page of events in a range, raising on API errors.
+        Nothing is shown until the whole range is in, so pages are as large as the API allows."""
+        events = []
+        next_token = None
+        
+        while True:
+            batch, next_token = self.fetch_events(
+                calendar_id=calendar_id,
+                max_results=API_PAGE_SIZE_MAX,
+                page_token=next_token,
+                start_date=start_date,
+                end_date=end_date,
+                raise_errors=True
+            )
+            events.extend(batch)
+            if not batch or not next_token:
+                return events
+    
+    def reconcile_month(self, year, month, calendar_id=DEFAULT_CALENDAR_ID):
+        """Refetch a month in full and reconcile the cached copy with it."""
+        start_date, end_date = self._get_month_date_range(year, month)
+        month_events = self._fetch_all_pages(calendar_id, start_date, end_date)
+        self.cache.replace_month(year, month, month_events)
+        return month_events
+    
+    def refresh_month(self, year, month, calendar_id=DEFAULT_CALENDAR_ID):
+        """Bring a month up to date, incrementally when sync tokens are enabled."""
+        if INCREMENTAL_SYNC:
+            return self.sync_events(calendar_id)
+        return self.reconcile_month(year, month, calendar_id)
+    
+    def sync_events(self, calendar_id=DEFAULT_CALENDAR_ID):
+        """Apply the changes since the last sync using the calendar's sync token.
+        Falls back to a full resync when there is no token or the server expired it."""
+        return self.inflight.do(('sync', calendar_id), self._sync_events, calendar_id)
+    
+    def _sync_events(self, calendar_id):
+        """Run one sync of a calendar; see sync_events."""
+        self._ensure_valid_token()
+        
+        sync_token = self.cache.get_sync_token(calendar_id)
+        if sync_token:
+            try:
+                items, next_sync_token = self._list_event_changes(calendar_id, sync_token=sync_token)
+                upserts, deleted_ids = self._split_event_changes(items)
+                self.cache.apply_delta(upserts, deleted_ids)
+                self.cache.set_sync_token(calendar_id, next_sync_token)
+                # The token covers the whole calendar, so the restored snapshot is now current
+                self.cache.mark_snapshot_reconciled()
+                return {'full_sync': False, 'updated': len(upserts), 'deleted': len(deleted_ids)}
+            except Exception as e:
+                if not self._is_sync_token_expired(e):
+                    print(f"Error syncing events: {str(e)}")
+                    raise
+                print("Sync token expired, performing a full resync")
+                self.cache.set_sync_token(calendar_id, None)
+                
+        return self._full_sync(calendar_id)
+    
+    def _full_sync(self, calendar_id):
+        """List every event in the sync window and replace the cached calendar events in it."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        first_month = self._offset_month(now.year, now.month, -SYNC_WINDOW_MONTHS_BACK)
+        last_month = self._offset_month(now.year, now.month, SYNC_WINDOW_MONTHS_AHEAD)
+        window_start, _ = self._get_month_date_range(*first_month)
+        _, window_end = self._get_month_date_range(*last_month)
+        
+        try:
+            items, next_sync_token = self._list_event_changes(calendar_id, time_min=window_start, time_max=window_end)
+        except Exception as e:
+            print(f"Error performing full sync: {str(e)}")
+            raise
+            
+        upserts, deleted_ids = self._split_event_changes(items)
+        fresh_ids = set(event.get('id') for event in upserts)
+        # Months only on disk count too, or restoring them would bring deleted events back
+        stale_ids = self.cache.get_event_ids_between(first_month, last_month) - fresh_ids
+        loaded_months = self._get_month_keys_in_range(window_start, window_end)
+        
+        self.cache.apply_delta(upserts, set(deleted_ids) | stale_ids, loaded_months)
+        self.cache.set_sync_token(calendar_id, next_sync_token)
+        return {'full_sync': True, 'updated': len(upserts), 'deleted': len(stale_ids) + len(deleted_ids)}
+    
+    def _list_event_changes(self, calendar_id, sync_token=None, time_min=None, time_max=None):
+        """Page through an incremental (sync_token) or initial (time_min to time_max) listing.
+        Returns tuple of (items, next_sync_token)."""
+        params = {
+            'calendarId': calendar_id,
+            'maxResults': API_PAGE_SIZE_MAX,
+            'singleEvents': True
+        }
+        
+        # Sync requests may not carry orderBy or a time window
+        if sync_token:
+            params['syncToken'] = sync_token
+        else:
+            params['timeMin'] = format_iso_for_api(time_min)
+            params['timeMax'] = format_iso_for_api(time_max)
+            
+        items = []
+        while True:
+            result = execute_list(self.service.events(), 'events', **params)
+            items.extend(result.get('items', []))
+            
+            page_token = result.get('nextPageToken')
+            if not page_token:
+                return items, result.get('nextSyncToken')
+            params['pageToken'] = page_token
+    
+    def _split_event_changes(self, items):
+        """Split listed changes into (upserted events, cancelled event IDs)."""
+        upserts = []
+        deleted_ids = []
+        for item in items:
+            if item.get('status') == 'cancelled':
+                deleted_ids.append(item.get('id'))
+            elif 'start' in item:
+                upserts.append(item)
+        return upserts, deleted_ids
+    
+    def _is_sync_token_expired(self, error):
+        """Check whether an API error is the 410 Gone returned for an invalid sync token."""
+        resp = getattr(error, 'resp', None)
+        return getattr(resp, 'status', None) == 410
+    
     def clear_cache_for_month(self, year, month):
         """Clear the cache for a specific month to force refresh."""
         self.cache.clear_month(year, month)
@@ -235,41 +382,85 @@ class CalendarManager:
             print(f"Error deleting event: {str(e)}")
             raise
 
-    def fetch_holidays(self, year, month):
-        """Fetch holidays for a specific month from Google Calendar."""
+    def batch_events(self, operations, calendar_id=DEFAULT_CALENDAR_ID):
+        """Create, update and delete events in batched HTTP requests.
+        Each operation is a dict with 'action' ('create', 'update' or 'delete') and, as the
+        action needs, 'event_id' and 'event'. Returns the per-operation results of execute_batched;
+        all successful mutations are applied to the cache in one update."""
         self._ensure_valid_token()
         
-        month_key = (year, month)
-        holidays = self.cache.get_holidays_for_month(year, month)
-        if holidays:
-            return holidays
-            
-        try:
-            holiday_calendar_id = 'en.usa#holiday@group.v.calendar.google.com'
-            
-            start_date, end_date = self._get_month_date_range(year, month)
-            end_date = datetime.datetime(end_date.year, end_date.month, end_date.day, 23, 59, 59, tzinfo=datetime.timezone.utc)
-            
-            time_min = format_iso_for_api(start_date)
-            time_max = format_iso_for_api(end_date)
-            
-            holidays_result = self.service.events().list(
-                calendarId=holiday_calendar_id,
-                timeMin=time_min,
-                timeMax=time_max,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
+        events = self.service.events()
+        requests = []
+        for operation in operations:
+            action = operation['action']
+            if action == 'create':
+                requests.append(events.insert(calendarId=calendar_id, body=operation['event']))
+            elif action == 'update':
+                requests.append(events.update(calendarId=calendar_id, eventId=operation['event_id'], 
+                                              body=operation['event']))
+            elif action == 'delete':
+                requests.append(events.delete(calendarId=calendar_id, eventId=operation['event_id']))
+            else:
+                raise ValueError(f"Unknown batch action: {action}")
+                
+        results = execute_batched(self.service, requests)
+        
+        upserts = []
+        deleted_ids = []
+        for operation, result in zip(operations, results):
+            if not result['success']:
+                print(f"Error in batched {operation['action']}: {str(result['error'])}")
+            elif operation['action'] == 'delete':
+                deleted_ids.append(operation['event_id'])
+            else:
+                upserts.append(result['result'])
+                
+        self.cache.apply_delta(upserts, deleted_ids)
+        return results
+
+    def fetch_holidays(self, year, month, force=False):
+        """Get the holidays of a month, fetching its whole year when the cached copy has expired."""
+        if force or not self.holidays_are_fresh(year):
+            try:
+                self.inflight.do(('holidays', year), self.fetch_holiday_years, year, year + HOLIDAY_YEARS_AHEAD)
+            except Exception as e:
+                # An expired copy is still better than nothing
+                print(f"Error fetching holidays: {str(e)}")
+                
+        return self.cache.get_holidays_for_month(year, month)
+        
+    def holidays_are_fresh(self, year):
+        """Check whether the cached holidays of a year are within their TTL."""
+        return self.cache.holidays_are_fresh(year, HOLIDAY_TTL_DAYS * 24 * 60 * 60)
+        
+    def fetch_holiday_years(self, first_year, last_year):
+        """Fetch the holidays of a span of years in one listing and cache them per year."""
+        self._ensure_valid_token()
+        
+        params = {
+            'calendarId': HOLIDAY_CALENDAR_ID,
+            'timeMin': format_iso_for_api(datetime.datetime(first_year, 1, 1, tzinfo=datetime.timezone.utc)),
+            'timeMax': format_iso_for_api(datetime.datetime(last_year + 1, 1, 1, tzinfo=datetime.timezone.utc)),
+            'maxResults': API_PAGE_SIZE_MAX,
+            'singleEvents': True,
+            'orderBy': 'startTime'
+        }
+        
+        holidays_by_year = {year: {} for year in range(first_year, last_year + 1)}
+        while True:
+            holidays_result = execute_list(self.service.events(), 'holidays', **params)
             
-            holidays = {}
             for item in holidays_result.get('items', []):
                 if 'date' in item['start']:
                     event_date = datetime.datetime.fromisoformat(item['start']['date']).date()
-                    holidays[event_date] = item['summary']
-                    
-            self.cache.add_holidays(year, month, holidays)
-            return holidays
+                    if event_date.year in holidays_by_year:
+                        holidays_by_year[event_date.year][event_date] = item['summary']
+                        
+            page_token = holidays_result.get('nextPageToken')
+            if not page_token:
+                break
+            params['pageToken'] = page_token
             
-        except Exception as e:
-            print(f"Error fetching holidays: {str(e)}")
-            return {} 
\ No newline at end of file
+        for year, holidays in holidays_by_year.items():
+            self.cache.add_holiday_year(year, holidays)
+        return holidays_by_year
\ No newline at end of file
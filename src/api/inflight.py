@@ -0,0 +1,50 @@
+import threading
+from concurrent.futures import Future
+
+class SingleFlight:
+    """Coalesces concurrent requests for the same key into one in-flight call."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def claim(self, keys):
+        """Claim keys for the calling thread.
+        Returns tuple of (owned_keys, futures) where owned_keys must be resolved by the
+        caller and futures belong to calls already in flight for the remaining keys."""
+        owned_keys = []
+        futures = []
+        with self.lock:
+            for key in keys:
+                future = self.calls.get(key)
+                if future is None:
+                    self.calls[key] = Future()
+                    owned_keys.append(key)
+                elif future not in futures:
+                    futures.append(future)
+        return owned_keys, futures
+
+    def resolve(self, keys, result=None, error=None):
+        """Finish the calls for keys claimed by this thread and wake every waiter."""
+        with self.lock:
+            futures = [self.calls.pop(key) for key in keys if key in self.calls]
+
+        for future in futures:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def do(self, key, func, *args, **kwargs):
+        """Run func once for all concurrent callers with the same key and share its result."""
+        owned_keys, futures = self.claim([key])
+        if futures:
+            return futures[0].result()
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.resolve(owned_keys, error=e)
+            raise
+        self.resolve(owned_keys, result=result)
+        return result
@@ -0,0 +1,48 @@
+import gzip
+import json
+from src.core.config import API_LIST_FIELDS, API_GZIP, MEASURE_PAYLOADS
+
+def prepare_request(request):
+    """Ask for a gzip-compressed response. httplib2 already sends Accept-Encoding: gzip, but
+    Google only compresses when the User-Agent also says gzip."""
+    if API_GZIP:
+        user_agent = request.headers.get('user-agent', '')
+        if 'gzip' not in user_agent:
+            request.headers['user-agent'] = f"{user_agent} (gzip)".strip()
+    return request
+
+def execute_list(resource, kind, **params):
+    """Execute a list call on a collection (e.g. service.events()) with the field mask
+    configured for kind in API_LIST_FIELDS, returning the parsed response."""
+    fields = API_LIST_FIELDS.get(kind)
+    if fields:
+        params['fields'] = fields
+
+    result = prepare_request(resource.list(**params)).execute()
+
+    if MEASURE_PAYLOADS:
+        _report_savings(resource, kind, params, result)
+
+    return result
+
+def _report_savings(resource, kind, params, result):
+    """Compare a projected response with the full one and log the difference.
+    Both are re-serialised as JSON and compared as such and gzipped, so the figures estimate
+    the bodies the API sends rather than measure bytes on the wire."""
+    try:
+        full_params = dict(params)
+        full_params.pop('fields', None)
+        full_result = resource.list(**full_params).execute()
+    except Exception as e:
+        print(f"Error measuring {kind} payload: {str(e)}")
+        return
+
+    full = json.dumps(full_result).encode('utf-8')
+    projected = json.dumps(result).encode('utf-8')
+    message = f"Payload [{kind}]: JSON {len(full)} B full vs {len(projected)} B projected"
+    if API_GZIP:
+        full_gzip, projected_gzip = len(gzip.compress(full)), len(gzip.compress(projected))
+        message += f"; gzipped {full_gzip} B full vs {projected_gzip} B projected ({full_gzip - projected_gzip} B saved)"
+    else:
+        message += f" ({len(full) - len(projected)} B saved)"
+    print(message)
@@ -0,0 +1,60 @@
+class SearchIndex:
+    """Incrementally maintained trigram index over task summaries.
+    Not thread-safe on its own; CacheManager updates and queries it under its lock."""
+
+    GRAM_SIZE = 3
+
+    def __init__(self):
+        self.grams = {}
+        self.summaries = {}
+
+    def _grams_of(self, text):
+        """Get every distinct GRAM_SIZE-character substring of text."""
+        return set(text[i:i + self.GRAM_SIZE] for i in range(len(text) - self.GRAM_SIZE + 1))
+
+    def add(self, event_id, summary):
+        """Index (or reindex) the summary of an event."""
+        lowered = (summary or '').lower()
+        if self.summaries.get(event_id) == lowered:
+            return
+        self.remove(event_id)
+
+        self.summaries[event_id] = lowered
+        for gram in self._grams_of(lowered):
+            if gram not in self.grams:
+                self.grams[gram] = set()
+            self.grams[gram].add(event_id)
+
+    def remove(self, event_id):
+        """Drop an event from the index."""
+        lowered = self.summaries.pop(event_id, None)
+        if lowered is None:
+            return
+
+        for gram in self._grams_of(lowered):
+            ids = self.grams.get(gram)
+            if ids is not None:
+                ids.discard(event_id)
+                if not ids:
+                    del self.grams[gram]
+
+    def search(self, term):
+        """Get the IDs of events whose summary contains term, case-insensitively."""
+        term = term.lower()
+        if not term:
+            return set(self.summaries)
+        if len(term) < self.GRAM_SIZE:
+            # Too short to index; a scan of the lowered summaries is still cheap
+            return set(event_id for event_id, lowered in self.summaries.items() if term in lowered)
+        if len(term) == self.GRAM_SIZE:
+            return set(self.grams.get(term, ()))
+
+        # Intersect the posting lists of every trigram, smallest first, then verify
+        postings = sorted((self.grams.get(term[i:i + self.GRAM_SIZE], set())
+                           for i in range(len(term) - self.GRAM_SIZE + 1)), key=len)
+        candidates = set(postings[0])
+        for ids in postings[1:]:
+            candidates &= ids
+            if not candidates:
+                break
+        return set(event_id for event_id in candidates if term in self.summaries[event_id])
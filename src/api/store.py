@@ -0,0 +1,247 @@
+import os
+import json
+import queue
+import sqlite3
+import threading
+from datetime import date
+
+class CacheStore:
+    """SQLite-backed persistent snapshot of the calendar cache."""
+
+    def __init__(self, db_path):
+        """Open (or create) the store and start the background writer."""
+        self.db_path = db_path
+        self.db_lock = threading.Lock()
+        self.write_queue = queue.Queue()
+
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+        self.writer = threading.Thread(target=self._writer_loop, name="CacheStoreWriter", daemon=True)
+        self.writer.start()
+
+    def _create_tables(self):
+        """Create the snapshot tables if they do not exist yet."""
+        with self.db_lock:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS events (
+                    id TEXT PRIMARY KEY,
+                    year INTEGER NOT NULL,
+                    month INTEGER NOT NULL,
+                    body TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS events_by_month ON events (year, month);
+                CREATE TABLE IF NOT EXISTS holidays (
+                    year INTEGER NOT NULL,
+                    month INTEGER NOT NULL,
+                    day TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    PRIMARY KEY (year, month, day)
+                );
+                CREATE TABLE IF NOT EXISTS holiday_years (
+                    year INTEGER PRIMARY KEY,
+                    fetched_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS fetched_ranges (
+                    year INTEGER NOT NULL,
+                    month INTEGER NOT NULL,
+                    PRIMARY KEY (year, month)
+                );
+                CREATE TABLE IF NOT EXISTS sync_tokens (
+                    calendar_id TEXT PRIMARY KEY,
+                    token TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS journal (
+                    op_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    body TEXT NOT NULL
+                );
+            """)
+            self.conn.commit()
+
+    def load(self):
+        """Load the stored snapshot, except the events themselves, which load_month reads a month at a time.
+        Returns tuple of (event_months, holidays_by_month, holiday_years, fetched_ranges, sync_tokens)."""
+        event_months = []
+        holidays_by_month = {}
+        holiday_years = {}
+        fetched_ranges = set()
+        sync_tokens = {}
+
+        try:
+            with self.db_lock:
+                month_rows = self.conn.execute("SELECT DISTINCT year, month FROM events").fetchall()
+                holiday_rows = self.conn.execute("SELECT year, month, day, name FROM holidays").fetchall()
+                holiday_year_rows = self.conn.execute("SELECT year, fetched_at FROM holiday_years").fetchall()
+                range_rows = self.conn.execute("SELECT year, month FROM fetched_ranges").fetchall()
+                token_rows = self.conn.execute("SELECT calendar_id, token FROM sync_tokens").fetchall()
+        except sqlite3.Error as e:
+            print(f"Error loading cache snapshot: {str(e)}")
+            return event_months, holidays_by_month, holiday_years, fetched_ranges, sync_tokens
+
+        event_months.extend((year, month) for year, month in month_rows)
+
+        for year, month, day, name in holiday_rows:
+            holidays_by_month.setdefault((year, month), {})[date.fromisoformat(day)] = name
+
+        holiday_years.update(holiday_year_rows)
+
+        for year, month in range_rows:
+            fetched_ranges.add((year, month))
+
+        sync_tokens.update(token_rows)
+
+        return event_months, holidays_by_month, holiday_years, fetched_ranges, sync_tokens
+
+    def load_month(self, year, month):
+        """Load the stored events of one month.
+        Returns tuple of (events, fetched) where fetched says whether the month was stored complete."""
+        try:
+            with self.db_lock:
+                rows = self.conn.execute("SELECT body FROM events WHERE year = ? AND month = ?", (year, month)).fetchall()
+                fetched = self.conn.execute("SELECT 1 FROM fetched_ranges WHERE year = ? AND month = ?", 
+                                            (year, month)).fetchone() is not None
+        except sqlite3.Error as e:
+            print(f"Error loading cached month: {str(e)}")
+            return [], False
+
+        events = []
+        for (body,) in rows:
+            try:
+                events.append(json.loads(body))
+            except ValueError:
+                continue
+        return events, fetched
+
+    def load_event_ids(self, first_month, last_month, source='calendar'):
+        """Get the IDs of stored events of a source filed from first_month to last_month, inclusive."""
+        try:
+            with self.db_lock:
+                rows = self.conn.execute(
+                    "SELECT id FROM events WHERE year * 12 + month BETWEEN ? AND ? "
+                    "AND COALESCE(json_extract(body, '$.source'), 'calendar') = ?",
+                    (first_month[0] * 12 + first_month[1], last_month[0] * 12 + last_month[1], source)).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error loading cached event IDs: {str(e)}")
+            return set()
+        return set(event_id for (event_id,) in rows)
+
+    def save_events(self, keyed_events):
+        """Queue an upsert of (month_key, event) pairs."""
+        rows = [(event['id'], month_key[0], month_key[1], json.dumps(event))
+                for month_key, event in keyed_events if event.get('id')]
+        if rows:
+            self.write_queue.put(("INSERT OR REPLACE INTO events (id, year, month, body) VALUES (?, ?, ?, ?)", rows))
+
+    def delete_events(self, event_ids):
+        """Queue the removal of events by ID."""
+        rows = [(event_id,) for event_id in event_ids if event_id]
+        if rows:
+            self.write_queue.put(("DELETE FROM events WHERE id = ?", rows))
+
+    def clear_month(self, year, month):
+        """Queue the removal of everything stored for a month."""
+        self.write_queue.put(("DELETE FROM events WHERE year = ? AND month = ?", [(year, month)]))
+        self.write_queue.put(("DELETE FROM holidays WHERE year = ? AND month = ?", [(year, month)]))
+        self.write_queue.put(("DELETE FROM holiday_years WHERE year = ?", [(year,)]))
+        self.write_queue.put(("DELETE FROM fetched_ranges WHERE year = ? AND month = ?", [(year, month)]))
+
+    def save_holidays(self, year, month, holidays):
+        """Queue a replacement of the holidays stored for a month."""
+        self.write_queue.put(("DELETE FROM holidays WHERE year = ? AND month = ?", [(year, month)]))
+        rows = [(year, month, day.isoformat(), name) for day, name in holidays.items()]
+        if rows:
+            self.write_queue.put(("INSERT OR REPLACE INTO holidays (year, month, day, name) VALUES (?, ?, ?, ?)", rows))
+
+    def save_holiday_year(self, year, holidays, fetched_at):
+        """Queue a replacement of every holiday stored for a year."""
+        self.write_queue.put(("DELETE FROM holidays WHERE year = ?", [(year,)]))
+        rows = [(year, day.month, day.isoformat(), name) for day, name in holidays.items()]
+        if rows:
+            self.write_queue.put(("INSERT OR REPLACE INTO holidays (year, month, day, name) VALUES (?, ?, ?, ?)", rows))
+        self.write_queue.put(("INSERT OR REPLACE INTO holiday_years (year, fetched_at) VALUES (?, ?)", [(year, fetched_at)]))
+
+    def mark_range_fetched(self, year, month):
+        """Queue recording a month as fetched."""
+        self.write_queue.put(("INSERT OR IGNORE INTO fetched_ranges (year, month) VALUES (?, ?)", [(year, month)]))
+
+    def save_sync_token(self, calendar_id, token):
+        """Queue storing (or clearing, when token is None) a calendar's sync token."""
+        if token:
+            self.write_queue.put(("INSERT OR REPLACE INTO sync_tokens (calendar_id, token) VALUES (?, ?)", [(calendar_id, token)]))
+        else:
+            self.write_queue.put(("DELETE FROM sync_tokens WHERE calendar_id = ?", [(calendar_id,)]))
+
+    def append_journal(self, entry):
+        """Durably append a pending write operation and return its op_id.
+        Journal writes bypass the write queue so they are on disk before this returns."""
+        with self.db_lock:
+            cursor = self.conn.execute("INSERT INTO journal (body) VALUES (?)", (json.dumps(entry),))
+            self.conn.commit()
+            return cursor.lastrowid
+
+    def update_journal(self, op_id, entry):
+        """Durably replace a pending write operation."""
+        with self.db_lock:
+            self.conn.execute("UPDATE journal SET body = ? WHERE op_id = ?", (json.dumps(entry), op_id))
+            self.conn.commit()
+
+    def remove_journal(self, op_id):
+        """Durably drop a finished write operation."""
+        with self.db_lock:
+            self.conn.execute("DELETE FROM journal WHERE op_id = ?", (op_id,))
+            self.conn.commit()
+
+    def load_journal(self):
+        """Load the pending write operations, oldest first, as (op_id, entry) pairs."""
+        try:
+            with self.db_lock:
+                rows = self.conn.execute("SELECT op_id, body FROM journal ORDER BY op_id").fetchall()
+        except sqlite3.Error as e:
+            print(f"Error loading write journal: {str(e)}")
+            return []
+
+        entries = []
+        for op_id, body in rows:
+            try:
+                entries.append((op_id, json.loads(body)))
+            except ValueError:
+                continue
+        return entries
+
+    def _writer_loop(self):
+        """Apply queued writes in order, batching everything that is pending."""
+        while True:
+            item = self.write_queue.get()
+            batch = [item]
+            while True:
+                try:
+                    batch.append(self.write_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                with self.db_lock:
+                    for statement, rows in batch:
+                        self.conn.executemany(statement, rows)
+                    self.conn.commit()
+            except sqlite3.Error as e:
+                print(f"Error writing cache snapshot: {str(e)}")
+            finally:
+                for _ in batch:
+                    self.write_queue.task_done()
+
+    def flush(self):
+        """Block until every queued write has been committed."""
+        self.write_queue.join()
+
+    def close(self):
+        """Flush pending writes and close the database."""
+        self.flush()
+        with self.db_lock:
+            self.conn.close()
@@ -1,20 +1,30 @@
 import threading
 import datetime
 from src.core.utils import format_date, format_time, generate_id, format_iso_for_api, parse_iso_from_api
-from src.core.config import DEFAULT_CALENDAR_ID, API_MAX_RESULTS
+from src.core.config import DEFAULT_CALENDAR_ID, API_TASKS_PAGE_SIZE_MAX
 from src.api.cache import CacheManager
+from src.api.inflight import SingleFlight
+from src.api.batch import execute_batched
+from src.api.payload import execute_list
 from src.core.models import Task
 
 class TaskManager:
     """Manages Google Tasks with local caching."""
     
-    def __init__(self, auth_manager):
-        """Initialize with an auth manager."""
+    def __init__(self, auth_manager, cache=None):
+        """Initialize with an auth manager and the cache shared with the calendar manager."""
         self.auth_service = auth_manager
-        self.service = self.auth_service.get_tasks_service()
-        self.cache = CacheManager()
-        self.fetch_lock = threading.Lock()
-        self.fetching_ranges = set()
+        self.cache = cache if cache is not None else CacheManager()
+        self.inflight = SingleFlight()
+        self.tasklists_lock = threading.Lock()
+        self.tasklist_ids = None
+        self.task_lists_by_task = {}
+        self.updated_min = {}
+        
+    @property
+    def service(self):
+        """The tasks service for the calling thread, from the auth manager's per-thread pool."""
+        return self.auth_service.get_service('tasks', 'v1')
         
     def _create_event_like_structure(self, task_id, title, due_datetime=None, completed=False, is_all_day=False):
         """Helper method to create a standardized event-like structure from a task."""
@@ -43,57 +53,151 @@ class TaskManager:
             'isAllDay': is_all_day
         }
         
-    def fetch_tasks(self, tasklist_id='@default', max_results=API_MAX_RESULTS):
-        """Fetch tasks from Google Tasks API."""
+    def fetch_tasks(self, tasklist_id=None, max_results=API_TASKS_PAGE_SIZE_MAX, full=False):
+        """Fetch tasks from Google Tasks API into the cache, from every task list when tasklist_id is None.
+        After the first fetch of a list only tasks changed since the last one are returned;
+        deleted tasks come back with status 'cancelled'. Pass full=True to list everything again.
+        Concurrent calls for the same task list share a single request."""
+        return self.inflight.do((tasklist_id, max_results, full), self._fetch_tasks, tasklist_id, max_results, full)
+    
+    def _fetch_tasks(self, tasklist_id, max_results, full):
+        """Run one fetch of one or all task lists and ingest it into the cache; see fetch_tasks."""
         self._ensure_valid_token()
         
         try:
-            if tasklist_id == '@default':
-                tasklists_result = self.service.tasklists().list().execute()
-                if tasklists_result.get('items'):
-                    tasklist_id = tasklists_result['items'][0]['id']
-
-            tasks_result = self.service.tasks().list(
-                tasklist=tasklist_id,
-                maxResults=max_results,
-                showCompleted=True,
-                showHidden=False
-            ).execute()
-            
-            tasks = tasks_result.get('items', [])
-
+            if tasklist_id is None:
+                tasklist_ids = self.get_tasklist_ids()
+            else:
+                tasklist_ids = [self._resolve_tasklist_id(tasklist_id)]
+            listed_in_full = tasklist_id is None and all(full or list_id not in self.updated_min 
+                                                         for list_id in tasklist_ids)
+                
+            # Lists that fetched fine are still ingested when another one fails
             processed_tasks = []
-            for task in tasks:
-                if not task.get('title'):
+            fetched_at = {}
+            for list_id in tasklist_ids:
+                try:
+                    tasks, fetched_at[list_id] = self._fetch_tasklist(list_id, max_results, full)
+                except Exception as e:
+                    print(f"Error fetching task list {list_id}: {str(e)}")
+                    listed_in_full = False
                     continue
-
-                due_datetime = None
-                is_all_day = False
+                processed_tasks.extend(tasks)
                 
-                if task.get('due'):
-                    raw_due = task['due'].replace('Z', '+00:00')
-                    due_datetime = datetime.datetime.fromisoformat(raw_due)
-                    is_all_day = due_datetime.hour == 0 and due_datetime.minute == 0 and due_datetime.second == 0
-                
-                event_like = self._create_event_like_structure(
-                    task_id=task.get('id'),
-                    title=task.get('title'),
-                    due_datetime=due_datetime,
-                    completed=task.get('completed'),
-                    is_all_day=is_all_day
-                )
-                processed_tasks.append(event_like)
+            upserts = [task for task in processed_tasks if task.get('status') != 'cancelled']
+            deleted_ids = [task['id'] for task in processed_tasks if task.get('status') == 'cancelled']
+            
+            # A full listing of every list is authoritative, so cached tasks missing from it are gone
+            if listed_in_full:
+                stale_ids = self.cache.invalidate_source('tasks', keep_ids=[task['id'] for task in upserts])
+                processed_tasks.extend({'id': task_id, 'status': 'cancelled', 'source': 'tasks'} 
+                                       for task_id in stale_ids)
                 
+            self.cache.apply_delta(upserts, deleted_ids)
+            
+            # Only move a list's lower bound once its changes are safely in the cache
+            self.updated_min.update(fetched_at)
             return processed_tasks, None
         except Exception as e:
             print(f"Error fetching tasks: {str(e)}")
             return [], None
+            
+    def get_tasklist_ids(self, refresh=False):
+        """Get the IDs of the user's task lists, the default list first; cached after the first call."""
+        with self.tasklists_lock:
+            if self.tasklist_ids is None or refresh:
+                tasklist_ids = []
+                params = {'maxResults': API_TASKS_PAGE_SIZE_MAX}
+                while True:
+                    result = execute_list(self.service.tasklists(), 'tasklists', **params)
+                    tasklist_ids.extend(item['id'] for item in result.get('items', []))
+                    
+                    page_token = result.get('nextPageToken')
+                    if not page_token:
+                        break
+                    params['pageToken'] = page_token
+                self.tasklist_ids = tasklist_ids
+            return list(self.tasklist_ids)
+            
+    def _resolve_tasklist_id(self, tasklist_id):
+        """Map '@default' to the ID of the user's first task list."""
+        if tasklist_id != '@default':
+            return tasklist_id
+        tasklist_ids = self.get_tasklist_ids()
+        return tasklist_ids[0] if tasklist_ids else tasklist_id
+        
+    def _tasklist_for(self, tasklist_id, task_id):
+        """Get the list a task belongs to, when the caller only knows '@default'."""
+        if tasklist_id == '@default':
+            return self.task_lists_by_task.get(task_id, tasklist_id)
+        return tasklist_id
+        
+    def _fetch_tasklist(self, tasklist_id, max_results, full):
+        """Page through one task list, incrementally when it has been fetched before.
+        Returns the listed tasks and the lower bound to use for the next incremental fetch."""
+        params = {
+            'tasklist': tasklist_id,
+            'maxResults': max_results,
+            'showCompleted': True,
+            'showHidden': False
+        }
+        
+        updated_min = None if full else self.updated_min.get(tasklist_id)
+        if updated_min:
+            params['updatedMin'] = format_iso_for_api(updated_min)
+            params['showDeleted'] = True
+            
+        # Allow for clock skew between us and the server when recording the next lower bound
+        fetch_started = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(minutes=1)
+        
+        processed_tasks = []
+        while True:
+            tasks_result = execute_list(self.service.tasks(), 'tasks', **params)
+            
+            for task in tasks_result.get('items', []):
+                event_like = self._process_listed_task(tasklist_id, task)
+                if event_like:
+                    processed_tasks.append(event_like)
+                    
+            page_token = tasks_result.get('nextPageToken')
+            if not page_token:
+                break
+            params['pageToken'] = page_token
+            
+        return processed_tasks, fetch_started
+        
+    def _process_listed_task(self, tasklist_id, task):
+        """Convert a listed task to its event-like form, or a 'cancelled' stub if it was deleted."""
+        task_id = task.get('id')
+        if task.get('deleted'):
+            self.task_lists_by_task.pop(task_id, None)
+            return {'id': task_id, 'status': 'cancelled', 'source': 'tasks'}
+            
+        if not task.get('title'):
+            return None
+            
+        self.task_lists_by_task[task_id] = tasklist_id
+        
+        due_datetime = None
+        is_all_day = False
+        
+        if task.get('due'):
+            raw_due = task['due'].replace('Z', '+00:00')
+            due_datetime = datetime.datetime.fromisoformat(raw_due)
+            is_all_day = due_datetime.hour == 0 and due_datetime.minute == 0 and due_datetime.second == 0
+        
+        return self._create_event_like_structure(
+            task_id=task_id,
+            title=task.get('title'),
+            due_datetime=due_datetime,
+            completed=task.get('completed'),
+            is_all_day=is_all_day
+        )
     
     def _ensure_valid_token(self):
         """Ensure the token is valid before making API calls."""
         try:
             self.auth_service.refresh_token_if_needed()
-            self.service = self.auth_service.get_tasks_service()
         except Exception as e:
             print(f"Error ensuring valid token: {str(e)}")
 
@@ -142,7 +246,7 @@ class TaskManager:
             }
             
             result = self.service.tasks().update(
-                tasklist=tasklist_id,
+                tasklist=self._tasklist_for(tasklist_id, task_id),
                 task=task_id,
                 body=task_body
             ).execute()
@@ -167,12 +271,68 @@ class TaskManager:
         
         try:
             self.service.tasks().delete(
-                tasklist=tasklist_id,
+                tasklist=self._tasklist_for(tasklist_id, task_id),
                 task=task_id
             ).execute()
             
+            self.task_lists_by_task.pop(task_id, None)
             self.cache.delete_event(task_id)
             return {'success': True}
         except Exception as e:
             print(f"Error deleting task: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
+
+    def batch_tasks(self, operations, tasklist_id='@default'):
+        """Create, update and delete tasks in batched HTTP requests.
+        Each operation is a dict with 'action' ('create', 'update' or 'delete') and, as the
+        action needs, 'task_id' and 'task' (a Task). Returns the per-operation results of
+        execute_batched; all successful mutations are applied to the cache in one update."""
+        self._ensure_valid_token()
+        
+        tasks = self.service.tasks()
+        requests = []
+        for operation in operations:
+            action = operation['action']
+            if action == 'create':
+                task_body = {
+                    'title': operation['task'].summary,
+                    'notes': '',
+                    'due': operation['task'].start_dt.date().isoformat()
+                }
+                requests.append(tasks.insert(tasklist=tasklist_id, body=task_body))
+            elif action == 'update':
+                task_body = {
+                    'title': operation['task'].summary,
+                    'due': operation['task'].start_dt.date().isoformat()
+                }
+                requests.append(tasks.update(tasklist=self._tasklist_for(tasklist_id, operation['task_id']), 
+                                             task=operation['task_id'], body=task_body))
+            elif action == 'delete':
+                requests.append(tasks.delete(tasklist=self._tasklist_for(tasklist_id, operation['task_id']), 
+                                             task=operation['task_id']))
+            else:
+                raise ValueError(f"Unknown batch action: {action}")
+                
+        results = execute_batched(self.service, requests)
+        
+        upserts = []
+        deleted_ids = []
+        for operation, result in zip(operations, results):
+            if not result['success']:
+                print(f"Error in batched {operation['action']}: {str(result['error'])}")
+            elif operation['action'] == 'delete':
+                deleted_ids.append(operation['task_id'])
+                result['result'] = {'success': True}
+            else:
+                event_like = self._create_event_like_structure(
+                    task_id=result['result'].get('id'),
+                    title=result['result'].get('title'),
+                    due_datetime=operation['task'].start_dt,
+                    completed=result['result'].get('completed'),
+                    is_all_day=True
+                )
+                upserts.append(event_like)
+                result['result'] = event_like
+                
+        self.cache.apply_delta(upserts, deleted_ids)
+        return results 
\ No newline at end of file
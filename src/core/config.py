@@ -8,8 +8,50 @@ calendar.setfirstweekday(6)
 SCOPES = ['https://www.googleapis.com/auth/calendar.events', 'https://www.googleapis.com/auth/tasks']
 TOKEN_FILE = os.path.join('config', 'token.json')
 CREDENTIALS_FILE = os.path.join('config', 'credentials.json')
+CACHE_DB_FILE = os.path.join('config', 'cache.db')
 DEFAULT_CALENDAR_ID = 'primary'
-API_MAX_RESULTS = 50
+# Listing starts with a small page so the first screen paints fast, then grows for background loads
+API_FIRST_PAGE_SIZE = 25
+API_PAGE_GROWTH = 4
+API_PAGE_SIZE_MAX = 2500
+API_TASKS_PAGE_SIZE_MAX = 100
+INCREMENTAL_SYNC = True
+# A full sync lists this many months before and after the current one
+SYNC_WINDOW_MONTHS_BACK = 12
+SYNC_WINDOW_MONTHS_AHEAD = 12
+API_FETCH_CONCURRENCY = 4
+API_WORKER_THREADS = 3
+API_BATCH_LIMIT = 50
+# Each thread keeps one keep-alive HTTP connection pool; requests on it time out after this long
+API_HTTP_TIMEOUT_SECONDS = 60
+OPTIMISTIC_WRITES = True
+JOURNAL_RETRY_BASE_SECONDS = 2
+JOURNAL_RETRY_MAX_SECONDS = 300
+
+# Partial responses: only these fields are requested from each list call (None for the full resource)
+API_LIST_FIELDS = {
+    'events': 'nextPageToken,nextSyncToken,items(id,status,summary,start,end)',
+    'holidays': 'nextPageToken,items(summary,start)',
+    'tasks': 'nextPageToken,items(id,title,due,status,completed,updated,deleted)',
+    'tasklists': 'nextPageToken,items(id)'
+}
+API_GZIP = True
+HOLIDAY_CALENDAR_ID = 'en.usa#holiday@group.v.calendar.google.com'
+# Holidays are fetched a year at a time, together with the following years, and kept this long
+HOLIDAY_YEARS_AHEAD = 1
+HOLIDAY_TTL_DAYS = 30
+# Months either side of the visible one loaded ahead of navigation; fast flipping looks further ahead
+PREFETCH_MONTHS = 1
+PREFETCH_MAX_MONTHS = 4
+PREFETCH_WINDOW_SECONDS = 2.0
+# Most prefetched-but-unvisited months kept in memory
+PREFETCH_MONTH_BUDGET = 12
+# Most months of events held in memory; least recently used months beyond this are evicted
+CACHE_MAX_MONTHS = 36
+# Months either side of today restored from disk before the window is shown; the rest load after it
+SNAPSHOT_EAGER_MONTHS = 1
+# Log how many bytes each list call saves; costs one extra unprojected request per call
+MEASURE_PAYLOADS = False
 
 # Color Theme
 BACKGROUND_COLOR = "#1E1E2F"
@@ -37,6 +79,7 @@ DEFAULT_DIALOG_WIDTH = 400
 DEFAULT_DIALOG_HEIGHT = 500
 DEFAULT_WINDOW_SIZE = (1400, 1000)
 MAX_TASKS_PER_CELL = 5
+SEARCH_DEBOUNCE_MS = 200
 
 # StyleSheets
 MAIN_STYLE = f"""
@@ -1,5 +1,8 @@
 class Task:
-    """Represents a task/event with start and end times."""
+    """Represents a task/event with start and end times.
+    Slotted, as the cache holds one per event; the cache shares that one instance across its indexes."""
+    __slots__ = ('summary', 'start_dt', 'end_dt', 'task_id', 'reminder_minutes', 'status', 'source', 'isAllDay')
+    
     def __init__(self, summary, start_dt, end_dt, task_id=None, reminder_minutes=10, status='Pending', source='calendar', isAllDay=False):
         self.summary = summary
         self.start_dt = start_dt
@@ -8,4 +11,28 @@ class Task:
         self.reminder_minutes = reminder_minutes
         self.status = status
         self.source = source
-        self.isAllDay = isAllDay 
\ No newline at end of file
+        self.isAllDay = isAllDay
+
+class EventRecord:
+    """Normalised calendar event, parsed once when it enters the cache."""
+    __slots__ = ('event_id', 'event', 'summary', 'source', 'start_dt', 'end_dt', 
+                 'start_ts', 'end_ts', 'local_date', 'last_date', 'is_all_day', 'month_key')
+    
+    def __init__(self, event_id, event, summary, source, start_dt, end_dt, local_date, last_date, is_all_day):
+        self.event_id = event_id
+        self.event = event
+        self.summary = summary
+        self.source = source
+        self.start_dt = start_dt
+        self.end_dt = end_dt
+        self.start_ts = start_dt.timestamp()
+        self.end_ts = end_dt.timestamp()
+        self.local_date = local_date
+        self.last_date = last_date
+        self.is_all_day = is_all_day
+        self.month_key = (start_dt.year, start_dt.month)
+        
+    def to_task(self):
+        """Build the Task shown by the views for this event."""
+        return Task(self.summary, self.start_dt, self.end_dt, task_id=self.event.get('id'), 
+                    source=self.source, isAllDay=self.is_all_day)
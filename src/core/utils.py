@@ -1,6 +1,8 @@
 import calendar
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone, timedelta, date, time
 import uuid
+from src.core.models import EventRecord
+from src.core.config import API_FIRST_PAGE_SIZE, API_PAGE_GROWTH, API_PAGE_SIZE_MAX
 
 def convert_to_24(hour_str, period):
     """Convert 12-hour time format to 24-hour format."""
@@ -59,6 +61,10 @@ def parse_iso_from_api(iso_str):
     """Parse ISO datetime string from Google API."""
     return datetime.fromisoformat(iso_str.replace('Z', '+00:00'))
 
+def next_page_size(page_size, max_size=API_PAGE_SIZE_MAX):
+    """Get the size of the page after one of page_size, growing geometrically up to max_size."""
+    return min(max_size, max(page_size, API_FIRST_PAGE_SIZE) * API_PAGE_GROWTH)
+
 def generate_id():
     """Generate a unique ID for tasks."""
     return str(uuid.uuid4())
@@ -76,13 +82,38 @@ def parse_event_datetime(event, field='start', as_date=False):
         if as_date:
             return local_date
             
-        local_tz = datetime.now().astimezone().tzinfo
-
+        # A naive astimezone() resolves the local offset for that date, without a now() call
         if field == 'start':
-            local_dt = datetime.combine(local_date, datetime.min.time()).replace(tzinfo=local_tz)
+            local_dt = datetime.combine(local_date, datetime.min.time())
         else:
-            local_dt = datetime.combine(local_date, datetime.max.time()).replace(tzinfo=local_tz)
+            local_dt = datetime.combine(local_date, datetime.max.time())
         
         return local_dt.astimezone(timezone.utc)
         
-    return datetime.now(timezone.utc) 
\ No newline at end of file
+    return datetime.now(timezone.utc)
+
+def normalize_event(event, event_id=None):
+    """Parse a calendar event once into an EventRecord with UTC instants and local days."""
+    start = event.get('start', {})
+    end = event.get('end', {})
+    
+    if 'date' in start:
+        local_date = date.fromisoformat(start['date'])
+        # All-day end dates are exclusive
+        end_day = date.fromisoformat(end.get('date', start['date']))
+        start_dt = datetime.combine(local_date, time.min).astimezone(timezone.utc)
+        end_dt = max(start_dt, datetime.combine(end_day, time.min).astimezone(timezone.utc))
+        last_date = max(local_date, end_day - timedelta(days=1))
+        is_all_day = 'date' in end or event.get('isAllDay', False)
+    else:
+        start_dt = parse_event_datetime(event, field='start').astimezone(timezone.utc)
+        end_dt = parse_event_datetime(event, field='end').astimezone(timezone.utc) if 'end' in event else start_dt
+        end_dt = max(start_dt, end_dt)
+        local_date = start_dt.astimezone().date()
+        last_date = max(local_date, (end_dt - timedelta(microseconds=1)).astimezone().date())
+        is_all_day = event.get('isAllDay', False)
+        
+    return EventRecord(
+        event_id or event.get('id'), event, event.get('summary'), event.get('source', 'calendar'),
+        start_dt, end_dt, local_date, last_date, is_all_day
+    ) 
\ No newline at end of file
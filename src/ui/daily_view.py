@@ -0,0 +1,262 @@
+import bisect
+from PyQt6.QtWidgets import QListView, QStyledItemDelegate, QAbstractItemView
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QPen, QPainter
+from src.core.config import (
+    BACKGROUND_COLOR, CARD_COLOR, FONT_HEADER, FONT_HEADER_SIZE, FONT_LABEL,
+    FONT_LABEL_SIZE, FONT_SMALL, FONT_SMALL_SIZE, FONT_DAY, FONT_DAY_SIZE,
+    FONT_DATE, FONT_DATE_SIZE, PADDING
+)
+from src.core.utils import format_datetime, format_task_time
+
+ROW_ROLE = Qt.ItemDataRole.UserRole + 1
+
+MONTH_HEADER_HEIGHT = 50
+MONTH_GAP = 20
+DATE_STRIP_WIDTH = 60
+CARD_HEIGHT = 60
+CARD_SPACING = PADDING // 2
+
+def task_sort_key(task):
+    """Order regular events first, then all-day events, then Google Tasks."""
+    if hasattr(task, 'source') and task.source == 'tasks':
+        return (2, task.start_dt)
+    elif hasattr(task, 'isAllDay') and task.isAllDay:
+        return (1, task.start_dt)
+    else:
+        return (0, task.start_dt)
+
+class DailyViewModel(QAbstractListModel):
+    """Flat list model of month headers and day rows for the daily view."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = [('empty',)]
+        self.date_rows = {}
+        self.month_rows = {}
+        self.sorted_dates = []
+
+    def set_tasks_by_date(self, tasks_by_date):
+        """Rebuild the rows from a {date: [tasks]} mapping."""
+        rows = []
+        date_rows = {}
+        month_rows = {}
+        month_counts = {}
+        for day, tasks in tasks_by_date.items():
+            month_key = (day.year, day.month)
+            month_counts[month_key] = month_counts.get(month_key, 0) + len(tasks)
+
+        current_month = None
+        for day in sorted(tasks_by_date.keys()):
+            month_key = (day.year, day.month)
+            if month_key != current_month:
+                month_rows[month_key] = len(rows)
+                rows.append(('month', day, month_counts[month_key], current_month is not None))
+                current_month = month_key
+            date_rows[day] = len(rows)
+            rows.append(('day', day, sorted(tasks_by_date[day], key=task_sort_key)))
+
+        self.beginResetModel()
+        self.rows = rows or [('empty',)]
+        self.date_rows = date_rows
+        self.month_rows = month_rows
+        self.sorted_dates = sorted(date_rows)
+        self.endResetModel()
+        
+    def update_dates(self, tasks_by_date):
+        """Replace the tasks of already listed days from a {date: [tasks]} mapping.
+        Returns False, changing nothing, if a day would have to be added or removed."""
+        if any(bool(tasks) != (day in self.date_rows) for day, tasks in tasks_by_date.items()):
+            return False
+            
+        changed_rows = []
+        resized = False
+        for day, tasks in tasks_by_date.items():
+            if not tasks:
+                continue
+            row = self.date_rows[day]
+            count_delta = len(tasks) - len(self.rows[row][2])
+            self.rows[row] = ('day', day, sorted(tasks, key=task_sort_key))
+            changed_rows.append(row)
+            
+            if count_delta:
+                resized = True
+                header_row = self.month_rows[(day.year, day.month)]
+                _, month_day, task_count, has_gap = self.rows[header_row]
+                self.rows[header_row] = ('month', month_day, task_count + count_delta, has_gap)
+                changed_rows.append(header_row)
+                
+        for row in changed_rows:
+            self.dataChanged.emit(self.index(row), self.index(row), [ROW_ROLE])
+        if resized:
+            # Row heights follow the card count, so the view has to lay the rows out again
+            self.layoutAboutToBeChanged.emit()
+            self.layoutChanged.emit()
+        return True
+
+    def row_for_date(self, day):
+        """Get the row of the first listed day on or after day, or None."""
+        position = bisect.bisect_left(self.sorted_dates, day)
+        if position < len(self.sorted_dates):
+            return self.date_rows[self.sorted_dates[position]]
+        return None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == ROW_ROLE:
+            return self.rows[index.row()]
+        return None
+
+class DailyCardDelegate(QStyledItemDelegate):
+    """Paints month headers, date strips and task cards without creating widgets."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.header_font = QFont(FONT_HEADER, FONT_HEADER_SIZE, QFont.Weight.Bold)
+        self.label_font = QFont(FONT_LABEL, FONT_LABEL_SIZE)
+        self.small_font = QFont(FONT_SMALL, FONT_SMALL_SIZE)
+        self.day_font = QFont(FONT_DAY, FONT_DAY_SIZE, QFont.Weight.Bold)
+        self.date_font = QFont(FONT_DATE, FONT_DATE_SIZE, QFont.Weight.Bold)
+
+    def sizeHint(self, option, index):
+        row = index.data(ROW_ROLE)
+        width = option.rect.width()
+        if row[0] == 'month':
+            return QSize(width, MONTH_HEADER_HEIGHT + (MONTH_GAP if row[3] else 0))
+        if row[0] == 'day':
+            card_count = max(1, len(row[2]))
+            return QSize(width, PADDING + card_count * (CARD_HEIGHT + CARD_SPACING))
+        return QSize(width, 80)
+
+    def card_rects(self, rect, row):
+        """Get (QRect, task) pairs for the cards of a day row painted in rect."""
+        left = rect.left() + PADDING + DATE_STRIP_WIDTH + PADDING
+        width = rect.right() - PADDING - left
+        top = rect.top() + PADDING // 2
+        return [(QRect(left, top + i * (CARD_HEIGHT + CARD_SPACING), width, CARD_HEIGHT), task)
+                for i, task in enumerate(row[2])]
+
+    def task_at(self, rect, row, pos):
+        """Get the task whose card contains pos, or None."""
+        if row[0] != 'day':
+            return None
+        for card_rect, task in self.card_rects(rect, row):
+            if card_rect.contains(pos):
+                return task
+        return None
+
+    def paint(self, painter, option, index):
+        row = index.data(ROW_ROLE)
+        rect = option.rect
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        if row[0] == 'month':
+            self._paint_month_header(painter, rect, row)
+        elif row[0] == 'day':
+            self._paint_day(painter, rect, row)
+        else:
+            painter.setFont(self.header_font)
+            painter.setPen(QColor("#E0E0E0"))
+            painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, "No tasks found for this period")
+
+        painter.restore()
+
+    def _paint_month_header(self, painter, rect, row):
+        """Paint a month/year separator with its task count."""
+        _, day, task_count, has_gap = row
+        header = QRect(rect.left(), rect.top() + (MONTH_GAP if has_gap else 0), rect.width(), MONTH_HEADER_HEIGHT)
+        painter.fillRect(header, QColor("#262640"))
+
+        text_rect = header.adjusted(PADDING, PADDING // 2, -PADDING, -PADDING // 2 - 2)
+        painter.setFont(self.header_font)
+        painter.setPen(QColor("#E0E0E0"))
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                         f"📅  {format_datetime(day, 'month_year')}")
+
+        painter.setFont(self.label_font)
+        painter.setPen(QColor("#AAAAFF"))
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter,
+                         f"({task_count} task{'s' if task_count != 1 else ''})")
+
+        painter.fillRect(QRect(header.left() + PADDING, header.bottom() - PADDING // 2 - 1,
+                               header.width() - 2 * PADDING, 2), QColor("#3A3A5C"))
+
+    def _paint_day(self, painter, rect, row):
+        """Paint the date strip and the task cards of one day."""
+        day = row[1]
+        strip = QRect(rect.left() + PADDING, rect.top() + PADDING // 2, DATE_STRIP_WIDTH, 50)
+        painter.setPen(QColor("#E0E0E0"))
+        painter.setFont(self.day_font)
+        painter.drawText(strip, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop, format_datetime(day, 'weekday'))
+        painter.setFont(self.date_font)
+        painter.drawText(strip, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignBottom, format_datetime(day, 'day'))
+
+        card_color = QColor(CARD_COLOR)
+        for card_rect, task in self.card_rects(rect, row):
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(card_color)
+            painter.drawRoundedRect(card_rect, 6, 6)
+
+            if hasattr(task, 'source') and task.source == 'tasks':
+                time_str = "Task"
+            elif hasattr(task, 'isAllDay') and task.isAllDay:
+                time_str = "All day"
+            else:
+                time_str = format_task_time(task.start_dt, task.end_dt)
+
+            painter.setPen(QPen(QColor("white")))
+            top_half = QRect(card_rect.left(), card_rect.top() + 6, card_rect.width(), card_rect.height() // 2 - 6)
+            bottom_half = QRect(card_rect.left(), card_rect.top() + card_rect.height() // 2, card_rect.width(), card_rect.height() // 2 - 6)
+            painter.setFont(self.label_font)
+            painter.drawText(top_half, Qt.AlignmentFlag.AlignCenter, task.summary)
+            painter.setFont(self.small_font)
+            painter.drawText(bottom_half, Qt.AlignmentFlag.AlignCenter, time_str)
+
+class DailyListView(QListView):
+    """Virtualised daily view; only the rows on screen are painted."""
+    taskClicked = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.daily_model = DailyViewModel(self)
+        self.card_delegate = DailyCardDelegate(self)
+        self.setModel(self.daily_model)
+        self.setItemDelegate(self.card_delegate)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setMouseTracking(False)
+        self.setStyleSheet(f"QListView {{ background-color: {BACKGROUND_COLOR}; border: none; }}")
+
+    def set_tasks_by_date(self, tasks_by_date):
+        """Replace the listed tasks."""
+        self.daily_model.set_tasks_by_date(tasks_by_date)
+
+    def update_dates(self, tasks_by_date):
+        """Replace the tasks of the given days in place; False if the list must be rebuilt."""
+        return self.daily_model.update_dates(tasks_by_date)
+
+    def scroll_to_date(self, day):
+        """Scroll so the first day on or after day is at the top."""
+        row = self.daily_model.row_for_date(day)
+        if row is None:
+            return
+        # Show the month header too when the day is the first of its month
+        if row > 0 and self.daily_model.rows[row - 1][0] == 'month':
+            row -= 1
+        self.scrollTo(self.daily_model.index(row), QAbstractItemView.ScrollHint.PositionAtTop)
+
+    def mousePressEvent(self, event):
+        index = self.indexAt(event.position().toPoint())
+        if index.isValid():
+            task = self.card_delegate.task_at(self.visualRect(index), index.data(ROW_ROLE), event.position().toPoint())
+            if task:
+                self.taskClicked.emit(task)
+                return
+        super().mousePressEvent(event)
@@ -1,27 +1,114 @@
+import heapq
+import itertools
 from datetime import datetime, timezone, timedelta
 from PyQt6.QtCore import QObject, QTimer, pyqtSignal
 from src.core.models import Task
 
+# Re-check at least this often so clock changes and sleep/resume are picked up
+MAX_TIMER_INTERVAL_MS = 60 * 60 * 1000
+
 class ReminderManager(QObject):
     """Manages task reminders and notifications."""
     reminderReady = pyqtSignal(Task)
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.reminders = []
-        self.timer = QTimer()
+        self.heap = []
+        self.entries = {}
+        self.sequence = itertools.count()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
         self.timer.timeout.connect(self.check_reminders)
-        self.timer.start(10*60000)  # Check every 10 minutes
+        
+    def _reminder_key(self, task):
+        """Get the key a task's reminder is stored under."""
+        return task.task_id if task.task_id else id(task)
         
     def add_reminder(self, task):
-        """Add a task to the reminder list."""
-        self.reminders.append(task)
+        """Schedule a reminder for a task, replacing any earlier one for the same task."""
+        key = self._reminder_key(task)
+        now = datetime.now(timezone.utc)
+        if task.status != 'Pending' or task.start_dt <= now:
+            self.cancel_reminder(key)
+            return
+        
+        reminder_time = task.start_dt - timedelta(minutes=task.reminder_minutes)
+        current = self.entries.get(key)
+        if current and current[0] == reminder_time:
+            self.entries[key] = (reminder_time, current[1], task)
+            return
+        
+        # Superseded heap entries are skipped lazily when they reach the top
+        sequence = next(self.sequence)
+        self.entries[key] = (reminder_time, sequence, task)
+        heapq.heappush(self.heap, (reminder_time, sequence, key))
+        self._compact()
+        self._arm()
+        
+    def reschedule_reminder(self, task):
+        """Move the reminder of a task whose start time or status changed."""
+        self.add_reminder(task)
+        
+    def apply_cache_change(self, change, cache):
+        """Follow a CacheChange: cancel reminders of removed tasks and (re)schedule added or updated ones.
+        Evicted tasks keep their reminders, as they have only left memory."""
+        for task_id in change.removed:
+            self.cancel_reminder(task_id)
+            
+        for task_id in change.added | change.updated:
+            task = cache.get_task_by_id(task_id)
+            if task:
+                self.reschedule_reminder(task)
+            else:
+                self.cancel_reminder(task_id)
+                
+    def cancel_reminder(self, task_id):
+        """Drop the reminder of a task, if any."""
+        if self.entries.pop(task_id, None) is not None:
+            self._compact()
+            self._arm()
+            
+    def _compact(self):
+        """Rebuild the heap once superseded entries outnumber live ones."""
+        if len(self.heap) > 2 * len(self.entries) + 64:
+            self.heap = [(reminder_time, sequence, key) 
+                         for key, (reminder_time, sequence, task) in self.entries.items()]
+            heapq.heapify(self.heap)
+            
+    def _discard_stale(self):
+        """Pop superseded and cancelled entries off the top of the heap."""
+        while self.heap:
+            reminder_time, sequence, key = self.heap[0]
+            current = self.entries.get(key)
+            if current and current[1] == sequence:
+                return
+            heapq.heappop(self.heap)
+            
+    def _arm(self):
+        """Arm the timer for the next due reminder."""
+        self._discard_stale()
+        if not self.heap:
+            self.timer.stop()
+            return
+        
+        delay = (self.heap[0][0] - datetime.now(timezone.utc)).total_seconds() * 1000
+        self.timer.start(int(min(max(delay, 0), MAX_TIMER_INTERVAL_MS)))
         
     def check_reminders(self):
-        """Check if any reminders need to be shown."""
+        """Show every reminder that has come due and re-arm for the next one."""
         now = datetime.now(timezone.utc)
-        for task in self.reminders:
-            reminder_time = task.start_dt - timedelta(minutes=task.reminder_minutes)
-            if (task.status == 'Pending' and 
-                reminder_time <= now < task.start_dt):
-                self.reminderReady.emit(task) 
\ No newline at end of file
+        while True:
+            self._discard_stale()
+            if not self.heap or self.heap[0][0] > now:
+                break
+            
+            reminder_time, sequence, key = heapq.heappop(self.heap)
+            task = self.entries.pop(key)[2]
+            if task.status == 'Pending' and now < task.start_dt:
+                self.reminderReady.emit(task)
+                
+        self._arm()
+        
+    def stop(self):
+        """Stop the reminder timer."""
+        self.timer.stop()
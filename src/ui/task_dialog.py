@@ -280,9 +280,10 @@ class TaskDialog(QDialog):
             return
             
         if self.task:
-            self.task.summary = summary
-            self.task.start_dt = start_dt
-            self.task.end_dt = end_dt
+            # The cache shares the original with its published generations, so edit a copy
+            self.task = Task(summary, start_dt, end_dt, task_id=self.task.task_id,
+                             reminder_minutes=self.task.reminder_minutes, status=self.task.status,
+                             source=self.task.source, isAllDay=self.task.isAllDay)
         else:
             source = 'tasks' if hasattr(self, 'service_type') and self.service_type.currentText() == "Task" else 'calendar'
             self.task = Task(summary, start_dt, end_dt, source=source)
@@ -1,25 +1,27 @@
-import sys
 import calendar
 from calendar import monthrange
 from datetime import datetime, timezone, timedelta
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
-    QPushButton, QFrame, QScrollArea, QCalendarWidget, QComboBox, 
-    QSpinBox, QStackedWidget, QGridLayout, QMessageBox
+    QPushButton, QFrame, QStackedWidget, QGridLayout
 )
-from PyQt6.QtCore import Qt, QSize, QTimer, QDate, pyqtSignal
-from PyQt6.QtGui import QColor, QFont
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QFont
 from src.core.config import (
     DEFAULT_WINDOW_SIZE, MAIN_STYLE, BACKGROUND_COLOR, HIGHLIGHT_COLOR, CARD_COLOR,
-    NAV_BG_COLOR, TEXT_COLOR, FONT_HEADER, FONT_HEADER_SIZE, FONT_LABEL, 
+    NAV_BG_COLOR, FONT_HEADER, FONT_HEADER_SIZE, FONT_LABEL, 
     FONT_LABEL_SIZE, FONT_SMALL, FONT_SMALL_SIZE, FONT_DAY, 
-    FONT_DAY_SIZE, FONT_DATE, FONT_DATE_SIZE, PADDING, 
-    MAX_TASKS_PER_CELL
+    FONT_DAY_SIZE, PADDING, 
+    MAX_TASKS_PER_CELL, SEARCH_DEBOUNCE_MS, OPTIMISTIC_WRITES, API_FIRST_PAGE_SIZE, INCREMENTAL_SYNC
 )
-from src.core.utils import format_datetime, format_task_time, format_iso_for_api
+from src.core.utils import format_datetime, format_task_time, format_iso_for_api, next_page_size
 from src.ui.task_dialog import TaskDialog
 from src.ui.reminder_manager import ReminderManager
+from src.ui.daily_view import DailyListView
 from src.workers.api_worker import APIWorker
+from src.workers.write_journal import WriteJournal
+from src.workers.prefetcher import MonthPrefetcher
+from src.workers.cache_notifier import CacheChangeNotifier
 from src.core.models import Task
 
 class TodoApp(QMainWindow):
@@ -44,6 +46,10 @@ class TodoApp(QMainWindow):
         
         self.wheel_scroll_locked = False
         
+        # (cache generation, search term[, year, month]) each view last drew, to skip redundant redraws
+        self.daily_rendered = None
+        self.monthly_rendered = None
+        
         self.init_ui()
         
         self.worker = APIWorker(self)
@@ -51,10 +57,22 @@ class TodoApp(QMainWindow):
         self.worker.taskError.connect(self.on_task_error)
         self.worker.loadingChanged.connect(self.on_loading_changed)
         
+        self.prefetcher = MonthPrefetcher(self.worker, self.calendar_manager)
+        
         self.reminder_manager = ReminderManager(self)
         self.reminder_manager.reminderReady.connect(self.show_reminder)
         
-        self.refresh_events()
+        self.journal = WriteJournal(self.calendar_manager, self.task_manager, self)
+        self.journal.operationCommitted.connect(self.on_write_committed)
+        self.journal.operationFailed.connect(self.on_write_failed)
+        
+        # Views redraw only the dates each batch of cache writes touched
+        self.cache_notifier = CacheChangeNotifier(self.calendar_manager.cache, self)
+        self.cache_notifier.cacheChanged.connect(self.on_cache_changed)
+        
+        self.paint_snapshot()
+        # Sync once the event loop runs, so the window is shown before the API client loads
+        QTimer.singleShot(0, self.refresh_events)
         
     def init_ui(self):
         """Initialize the main UI components."""
@@ -87,7 +105,12 @@ class TodoApp(QMainWindow):
         
         self.search_entry = QLineEdit()
         self.search_entry.setPlaceholderText("Search tasks...")
-        self.search_entry.textChanged.connect(self.filter_content)
+        # Filter once typing pauses instead of on every keystroke
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.filter_content)
+        self.search_entry.textChanged.connect(self.search_timer.start)
         search_layout.addWidget(self.search_entry)
         
         nav_layout.addWidget(search_frame, 1)
@@ -135,13 +158,8 @@ class TodoApp(QMainWindow):
         """Initialize the main content area with stacked views."""
         self.views_stack = QStackedWidget()
         
-        self.daily_view = QScrollArea()
-        self.daily_view.setWidgetResizable(True)
-        self.daily_content = QWidget()
-        self.daily_layout = QVBoxLayout(self.daily_content)
-        self.daily_layout.setSpacing(PADDING/2)
-        self.daily_layout.setContentsMargins(PADDING, PADDING, PADDING, PADDING)
-        self.daily_view.setWidget(self.daily_content)
+        self.daily_view = DailyListView()
+        self.daily_view.taskClicked.connect(self.open_task_dialog)
         
         self.monthly_view = QWidget()
         self.monthly_layout = QVBoxLayout(self.monthly_view)
@@ -155,54 +173,69 @@ class TodoApp(QMainWindow):
     
     def on_task_completed(self, result, task_type):
         """Handle completed tasks from worker thread."""
-        if task_type == "fetch_events":
+        if task_type == "fetch_events" or task_type == "background_fetch":
             events, next_token = result
-            if events:
-                self._process_loaded_events(events)
             
+            # The worker has already ingested the page; the change feed redraws it
             if next_token:
                 self._fetch_next_page(next_token)
-            else:
-                self._update_current_view()
+                
+            self._on_events_ingested(events)
                 
         elif task_type == "fetch_tasks":
+            # The task manager has already ingested these into the shared cache
             tasks, _ = result
-            if tasks:
-                self._process_loaded_events(tasks)
-                self._update_current_view()
+            self._on_events_ingested(tasks)
                 
-        elif task_type == "background_fetch":
-            events, next_token = result
-            if events:
-                self._process_loaded_events(events)
-            
-            if next_token:
-                self._fetch_next_page(next_token)
-            else:
-                self._update_current_view()
-                
-        elif task_type == "fetch_month":
-            if self.current_view == "monthly":
-                search_term = self.search_entry.text() if hasattr(self, 'search_entry') else ""
-                tasks_by_date = self.calendar_manager.cache.get_tasks_for_month(self.displayed_year, self.displayed_month)
-                
-                self._update_calendar_cells(tasks_by_date, search_term)
-            else:
-                self._update_current_view()
+        elif task_type in ("fetch_month", "refresh_month", "sync_events"):
+            # A sync may have overwritten edits the server has not seen yet
+            # The changed dates are redrawn through the cache change feed
+            if self.journal.has_pending():
+                self.journal.reapply_pending()
             
         elif task_type == "fetch_holidays":
             self._update_holidays(result)
             
+        elif task_type == "prefetch":
+            # Prefetched months are only read from the cache once navigated to
+            pass
+            
+        elif task_type == "preload":
+            # Months read back from disk are drawn through the cache change feed
+            if result and self.journal.has_pending():
+                self.journal.reapply_pending()
+            
         elif task_type == "create_task" or task_type == "update_task":
             action = "created" if task_type == "create_task" else "updated"
             self.show_alert(f"Task {action}: {result['summary']}", duration=3000)
             
-            self._update_current_view()
-            
         elif task_type == "delete_task":
-            self.show_alert(f"Task deleted", duration=3000)
+            self.show_alert("Task deleted", duration=3000)
+        
+    def on_write_committed(self, entry):
+        """Handle a journaled edit the server has accepted."""
+        if entry['action'] == 'delete':
+            self.show_alert("Task deleted", duration=3000)
+        else:
+            action = "created" if entry['action'] == 'create' else "updated"
+            self.show_alert(f"Task {action}: {entry['result']['summary']}", duration=3000)
+        
+    def on_write_failed(self, entry, error):
+        """Handle a journaled edit the server rejected; the cache has been rolled back."""
+        self.show_alert(f"Failed to {entry['action']} task: {str(error)}", duration=4000)
+        
+    def on_cache_changed(self, change):
+        """Follow a batch of cache writes: update reminders and redraw only the dates it touched."""
+        self.reminder_manager.apply_cache_change(change, self.calendar_manager.cache)
+        
+        if not change.dates:
+            return
             
-            self._update_current_view()
+        search_term = self.search_entry.text() if hasattr(self, 'search_entry') else ""
+        if self.current_view == "daily":
+            self._update_daily_dates(change, search_term)
+        elif self.current_view == "monthly":
+            self._update_monthly_dates(change, search_term)
         
     def on_task_error(self, error, task_type):
         """Handle errors from worker thread."""
@@ -214,6 +247,10 @@ class TodoApp(QMainWindow):
             self.show_alert(f"Error fetching tasks: {str(error)}", duration=4000)
             self._update_current_view()
             
+        elif task_type == "sync_events":
+            print(f"Sync failed, fetching events instead: {str(error)}")
+            self._fetch_event_pages()
+            
         elif task_type in ["create_task", "update_task"]:
             action = "create" if task_type == "create_task" else "update"
             self.show_alert(f"Failed to {action} task: {str(error)}", duration=4000)
@@ -221,6 +258,9 @@ class TodoApp(QMainWindow):
         elif task_type == "delete_task":
             self.show_alert(f"Failed to delete task: {str(error)}", duration=4000)
             
+        elif task_type == "prefetch":
+            print(f"Prefetch failed: {str(error)}")
+            
         else:
             self.show_alert(f"Error in {task_type}: {str(error)}", duration=4000)
             
@@ -242,34 +282,74 @@ class TodoApp(QMainWindow):
         self.show_alert(f"Reminder: {task.summary} at {time_str}", duration=5000)
         
     def refresh_events(self):
-        """Refresh events from Google Calendar."""
+        """Bring the cached events up to date with Google Calendar.
+        Only the changes since the last sync are listed; paging through every event is the
+        fallback for when sync tokens are disabled or the sync fails."""
+        if INCREMENTAL_SYNC:
+            self.worker.add_task(
+                "sync_events",
+                self.calendar_manager.sync_events,
+                calendar_id='primary'
+            )
+        else:
+            self._fetch_event_pages()
+        
+        if self.task_manager:
+            self.worker.add_task(
+                "fetch_tasks",
+                self.task_manager.fetch_tasks
+            )
+            
+    def _fetch_event_pages(self):
+        """Page through the events from the start of this month."""
         now = datetime.now()
         start_date = datetime(now.year, now.month, 1, tzinfo=timezone.utc)
         
+        # The first page is kept small so it paints quickly; later pages grow
+        self.page_start_date = start_date
+        self.page_size = API_FIRST_PAGE_SIZE
+        
         self.worker.add_task(
             "fetch_events",
-            self.calendar_manager.fetch_events,
+            self.calendar_manager.load_events_page,
             calendar_id='primary',
-            max_results=50,
+            max_results=self.page_size,
             start_date=start_date
         )
+
+    def paint_snapshot(self):
+        """Render the months around today the persistent cache restored, then reconcile them
+        and load the other stored months in the background."""
+        cache = self.calendar_manager.cache
+        for task in cache.get_all_tasks():
+            self.reminder_manager.add_reminder(task)
+            
+        self._update_current_view()
+        self._reconcile_if_stale(self.displayed_year, self.displayed_month)
         
-        if self.task_manager:
+        self.worker.add_task("preload", cache.load_deferred_snapshot)
+        
+    def _reconcile_if_stale(self, year, month):
+        """Queue a reconcile of a month that was only restored from disk."""
+        if (year, month) in self.calendar_manager.cache.get_snapshot_months():
             self.worker.add_task(
-                "fetch_tasks",
-                self.task_manager.fetch_tasks,
-                tasklist_id='@default',
-                max_results=50
+                "refresh_month",
+                self.calendar_manager.refresh_month,
+                group="refresh_month",
+                year=year,
+                month=month
             )
-
+            
     def _fetch_next_page(self, page_token):
-        """Fetch the next page of events."""
+        """Fetch the next page of events, larger than the last."""
+        self.page_size = next_page_size(self.page_size)
         self.worker.add_task(
             "background_fetch",
-            self.calendar_manager.fetch_events,
+            self.calendar_manager.load_events_page,
             calendar_id='primary',
-            max_results=50,
-            page_token=page_token
+            max_results=self.page_size,
+            page_token=page_token,
+            start_date=self.page_start_date
         )
         
     def _update_current_view(self):
@@ -279,193 +359,50 @@ class TodoApp(QMainWindow):
         elif self.current_view == "monthly":
             self._update_monthly_view_data(self.search_entry.text() if hasattr(self, 'search_entry') else "")
         
-    def _process_loaded_events(self, events):
-        """Process loaded events and update the cache."""
-        added_count = 0
-        
-        for event in events:
-            event_id = event.get('id')
-            
-            if event_id and self.calendar_manager.cache.has_event_id(event_id):
-                continue
-                
-            self.calendar_manager.cache.add_event(event)
-            added_count += 1
-            
-            task = self.calendar_manager.cache._convert_event_to_task(event)
-            if task:
-                self.reminder_manager.add_reminder(task)
-        
-        if added_count > 0:
-            self._update_current_view()
+    def _on_events_ingested(self, events):
+        """Reapply pending edits over events that have just entered the cache.
+        Reminders and the view follow the cache change feed."""
+        # Our own edits the server has not seen yet win over what was just loaded
+        if events and self.journal.has_pending():
+            self.journal.reapply_pending()
             
     def get_filtered_tasks_by_date(self, search_term=""):
         """Get tasks filtered by search term, organized by date."""
-        tasks_by_date = self._get_tasks_by_date_dict()
-
         if not search_term:
-            return tasks_by_date
+            return self._get_tasks_by_date_dict()
         
-        search_term = search_term.lower()
-        return {date: [task for task in tasks if search_term in task.summary.lower()] 
-                for date, tasks in tasks_by_date.items() 
-                if any(search_term in task.summary.lower() for task in tasks)}
+        return self.calendar_manager.cache.get_matching_tasks_by_date(search_term)
     
     def _get_tasks_by_date_dict(self):
-        """Get tasks organized by date from the cache."""
-        return self.calendar_manager.cache.tasks_by_date.copy()
+        """Get tasks organized by date from the latest cache generation, without locking."""
+        return self.calendar_manager.cache.get_generation().get_tasks_by_date()
             
     def build_daily_view(self, search_term=""):
         """Build the daily view with all tasks organized by date."""
-        self.clear_widget(self.daily_content)
-        
-        tasks_by_date = self.get_filtered_tasks_by_date(search_term)
-        
-        sorted_dates = sorted(tasks_by_date.keys())
-        
-        if not sorted_dates:
-            no_tasks_label = QLabel("No tasks found for this period")
-            no_tasks_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            no_tasks_label.setFont(QFont(FONT_HEADER, FONT_HEADER_SIZE))
-            self.daily_layout.addWidget(no_tasks_label)
-            self.daily_layout.addStretch(1)
+        generation = self.calendar_manager.cache.get_generation()
+        if self.daily_rendered == (generation.number, search_term):
             return
             
-        tasks_by_month = {}
-        for day, tasks in tasks_by_date.items():
-            month_key = (day.year, day.month)
-            if month_key not in tasks_by_month:
-                tasks_by_month[month_key] = []
-            tasks_by_month[month_key].extend(tasks)
+        self.daily_view.set_tasks_by_date(self.get_filtered_tasks_by_date(search_term))
+        self.daily_rendered = (generation.number, search_term)
+        
+    def _update_daily_dates(self, change, search_term=""):
+        """Refresh the changed days of the daily view, rebuilding it only if days appear or disappear."""
+        cache = self.calendar_manager.cache
+        generation = cache.get_generation()
+        matching_ids = cache.search_ids(search_term) if search_term else None
+        
+        tasks_by_date = {}
+        for day in change.dates:
+            tasks = generation.get_tasks_for_date(day)
+            if matching_ids is not None:
+                tasks = [t for t in tasks if t.task_id in matching_ids]
+            tasks_by_date[day] = tasks
             
-        self.month_containers = {}
-        
-        current_month = None
-        current_year = None
-        
-        for day in sorted_dates:
-            if current_year != day.year or current_month != day.month:
-                month_key = (day.year, day.month)
-                task_count = len(tasks_by_month.get(month_key, []))
-                
-                if current_month is not None:
-                    self.daily_layout.addSpacing(20)
-                
-                self.create_month_separator(day, task_count)
-                
-                current_month = day.month
-                current_year = day.year
-                
-            month_key = (day.year, day.month)
-            if month_key in self.month_containers:
-                self.create_day_content(day, tasks_by_date[day], self.month_containers[month_key]['container'])
-                
-    def create_month_separator(self, day, task_count):
-        """Create a month/year separator with a simple text header."""
-        month_key = (day.year, day.month)
-        
-        separator_frame = QFrame()
-        separator_frame.setStyleSheet("background-color: #262640;")
-        separator_frame.setMinimumHeight(40)
-        self.daily_layout.addWidget(separator_frame)
-        
-        separator_layout = QVBoxLayout(separator_frame)
-        separator_layout.setContentsMargins(PADDING, PADDING//2, PADDING, PADDING//2)
-        separator_layout.setSpacing(0)
-        
-        header_layout = QHBoxLayout()
-        
-        month_year_text = format_datetime(day, 'month_year')
-        task_count_text = f"({task_count} task{'s' if task_count != 1 else ''})"
-        
-        month_label = QLabel(f"📅  {month_year_text}")
-        month_label.setFont(QFont(FONT_HEADER, FONT_HEADER_SIZE, QFont.Weight.Bold))
-        header_layout.addWidget(month_label, 1)
-        
-        count_label = QLabel(task_count_text)
-        count_label.setStyleSheet("color: #AAAAFF;")
-        count_label.setFont(QFont(FONT_LABEL, FONT_LABEL_SIZE))
-        header_layout.addWidget(count_label)
-        
-        separator_layout.addLayout(header_layout)
-        
-        divider = QFrame()
-        divider.setFrameShape(QFrame.Shape.HLine)
-        divider.setStyleSheet("background-color: #3A3A5C;")
-        divider.setFixedHeight(2)
-        separator_layout.addWidget(divider)
-        
-        month_container = QWidget()
-        month_layout = QVBoxLayout(month_container)
-        month_layout.setContentsMargins(0, 0, 0, 0)
-        month_layout.setSpacing(PADDING//2)
-        
-        self.daily_layout.addWidget(month_container)
-        
-        self.month_containers[month_key] = {
-            'frame': separator_frame,
-            'header_label': month_label,
-            'container': month_container,
-            'expanded': True
-        }
-            
-    def create_day_content(self, day, tasks, parent_container):
-        """Create the content for a single day."""
-        day_frame = QFrame()
-        day_frame.setStyleSheet(f"background-color: {BACKGROUND_COLOR};")
-        
-        day_layout = QHBoxLayout(day_frame)
-        day_layout.setContentsMargins(PADDING, PADDING//2, PADDING, PADDING//2)
-        
-        date_strip = self.create_date_strip(day)
-        day_layout.addWidget(date_strip)
-        
-        tasks_container = QWidget()
-        tasks_layout = QVBoxLayout(tasks_container)
-        tasks_layout.setContentsMargins(PADDING, 0, 0, 0)
-        tasks_layout.setSpacing(PADDING//2)
-        
-        def sort_key(task):
-            if hasattr(task, 'source') and task.source == 'tasks':
-                return (2, task.start_dt)  # Google Tasks last
-            elif hasattr(task, 'isAllDay') and task.isAllDay:
-                return (1, task.start_dt)  # All-day events second
-            else:
-                return (0, task.start_dt)  # Regular events first
-                
-        sorted_tasks = sorted(tasks, key=sort_key)
-        
-        for task in sorted_tasks:
-            task_card = self.create_task_card(task, False)
-            tasks_layout.addWidget(task_card)
-            
-        day_layout.addWidget(tasks_container, 1)
-        
-        parent_layout = parent_container.layout()
-        parent_layout.addWidget(day_frame)
-        
-    def create_date_strip(self, day):
-        """Create the date strip showing weekday and date."""
-        date_strip = QWidget()
-        date_strip.setMinimumWidth(50)
-        
-        strip_layout = QVBoxLayout(date_strip)
-        strip_layout.setContentsMargins(0, 0, 0, 0)
-        strip_layout.setSpacing(0)
-        
-        weekday_label = QLabel(format_datetime(day, 'weekday'))
-        weekday_label.setFont(QFont(FONT_DAY, FONT_DAY_SIZE, QFont.Weight.Bold))
-        weekday_label.setAlignment(Qt.AlignmentFlag.AlignLeft)
-        strip_layout.addWidget(weekday_label)
-        
-        day_label = QLabel(format_datetime(day, 'day'))
-        day_label.setFont(QFont(FONT_DATE, FONT_DATE_SIZE, QFont.Weight.Bold))
-        day_label.setAlignment(Qt.AlignmentFlag.AlignLeft)
-        strip_layout.addWidget(day_label)
-        
-        strip_layout.addStretch(1)
-        
-        return date_strip
+        if not self.daily_view.update_dates(tasks_by_date):
+            self.build_daily_view(search_term)
+        elif self.daily_rendered and self.daily_rendered[1] == search_term:
+            self.daily_rendered = (max(self.daily_rendered[0], change.generation), search_term)
         
     def create_task_card(self, task, is_monthly_view=False):
         """Create a card for displaying a task."""
@@ -586,24 +523,25 @@ class TodoApp(QMainWindow):
             self.current_view = "daily"
             self.view_toggle_button.setText("Monthly View")
             self.views_stack.setCurrentIndex(0)
+            # Loads queued for the monthly view would only compete with the daily one
+            self.worker.cancel_group("visible_month")
+            self.worker.cancel_group("visible_holidays")
+            self.prefetcher.cancel()
             self.build_daily_view(self.search_entry.text())
         QTimer.singleShot(100, self.scroll_to_today)
         
     def show_add_task_dialog(self):
         """Show dialog to add a new task with option to select destination service."""
-        from src.ui.task_dialog import TaskDialog
         dialog = TaskDialog(self, on_confirm=self.on_task_dialog_confirm)
         dialog.exec()
         
     def open_task_dialog(self, task=None):
         """Open the task dialog for editing an existing task."""
-        from src.ui.task_dialog import TaskDialog
         dialog = TaskDialog(self, on_confirm=self.on_task_dialog_confirm, task=task)
         dialog.exec()
         
     def open_task_dialog_for_date(self, date):
         """Open the task dialog with the selected date pre-filled."""
-        from src.ui.task_dialog import TaskDialog
         # Create a new task with the selected date
         start_time = datetime.combine(date, datetime.min.time())
         end_time = start_time + timedelta(hours=1)
@@ -617,6 +555,10 @@ class TodoApp(QMainWindow):
         
     def on_task_dialog_confirm(self, task):
         """Handle confirmed task from dialog."""
+        if OPTIMISTIC_WRITES:
+            self._write_task_optimistically(task)
+            return
+            
         if (task.task_id and hasattr(task, 'source') and task.source == 'tasks') or \
            (not task.task_id and hasattr(task, 'source') and task.source == 'tasks'):
             if self.task_manager:
@@ -660,12 +602,43 @@ class TodoApp(QMainWindow):
                     event=event
                 )
                 
+    def _write_task_optimistically(self, task):
+        """Apply a confirmed task to the cache at once and leave sending it to the journal."""
+        if hasattr(task, 'source') and task.source == 'tasks':
+            if not self.task_manager:
+                self.show_alert("Cannot manage task: Task manager not available", duration=3000)
+                return
+            if task.task_id:
+                self.journal.update_task(task.task_id, task)
+            else:
+                self.journal.create_task(task)
+        else:
+            event = {
+                'summary': task.summary,
+                'start': {'dateTime': format_iso_for_api(task.start_dt), 'timeZone': 'UTC'},
+                'end': {'dateTime': format_iso_for_api(task.end_dt), 'timeZone': 'UTC'}
+            }
+            if task.task_id:
+                self.journal.update_event(task.task_id, event)
+            else:
+                self.journal.create_event(event)
+        
     def delete_task(self, task):
         """Delete a task from the calendar or tasks API."""
         if not task or not task.task_id:
             self.show_alert("Cannot delete task: no task ID", duration=3000)
             return
         
+        if OPTIMISTIC_WRITES:
+            if hasattr(task, 'source') and task.source == 'tasks':
+                if not self.task_manager:
+                    self.show_alert("Cannot delete task: Task manager not available", duration=3000)
+                    return
+                self.journal.delete_task(task.task_id)
+            else:
+                self.journal.delete_event(task.task_id)
+            return
+        
         if hasattr(task, 'source') and task.source == 'tasks':
             if self.task_manager:
                 self.worker.add_task(
@@ -687,6 +660,7 @@ class TodoApp(QMainWindow):
     def _create_monthly_view_structure(self):
         """Create the static widgets for the monthly view."""
         self.clear_widget(self.monthly_view)
+        self.monthly_rendered = None
         self._create_month_header()
         self._create_calendar_grid()
         
@@ -826,17 +800,39 @@ class TodoApp(QMainWindow):
         
         start_date, end_date = self._get_month_date_range(self.displayed_year, self.displayed_month)
         
-        tasks_by_date = self.calendar_manager.cache.get_tasks_for_month(self.displayed_year, self.displayed_month)
+        cache = self.calendar_manager.cache
+        cache.pin_months([(self.displayed_year, self.displayed_month)])
         
-        if tasks_by_date and not force_refresh:
+        # Fetched dates are filled in through the change feed, so empty days are drawn as empty now
+        generation = cache.get_generation()
+        rendered = (generation.number, search_term, self.displayed_year, self.displayed_month)
+        if self.monthly_rendered != rendered:
+            tasks_by_date = generation.get_tasks_between_dates(start_date.date(), end_date.date())
             self._update_calendar_cells(tasks_by_date, search_term)
-        else:
-            if force_refresh:
-                self.calendar_manager.clear_cache_for_month(self.displayed_year, self.displayed_month)
+            self.monthly_rendered = rendered
+            
+        if force_refresh:
+            self.worker.add_task(
+                "refresh_month",
+                self.calendar_manager.refresh_month,
+                group="refresh_month",
+                year=self.displayed_year,
+                month=self.displayed_month
+            )
             
+            if self.task_manager:
+                self.worker.add_task(
+                    "fetch_tasks",
+                    self.task_manager.fetch_tasks
+                )
+        elif cache.month_is_cached(self.displayed_year, self.displayed_month):
+            self._reconcile_if_stale(self.displayed_year, self.displayed_month)
+        else:
+            # A newer month supersedes any queued fetch for a month scrolled past
             self.worker.add_task(
                 "fetch_month",
                 self.calendar_manager.fetch_events_for_range,
+                group="visible_month",
                 start_date=start_date,
                 end_date=end_date
             )
@@ -847,13 +843,20 @@ class TodoApp(QMainWindow):
                     self.task_manager.fetch_tasks
                 )
         
+        self.prefetcher.month_shown(self.displayed_year, self.displayed_month)
+        
+        # Cached holidays are painted right away; the network is only used once they expire
         holidays = self.calendar_manager.cache.get_holidays_for_month(self.displayed_year, self.displayed_month)
-        if not holidays or force_refresh:
+        self._update_holidays(holidays)
+        
+        if force_refresh or not self.calendar_manager.holidays_are_fresh(self.displayed_year):
             self.worker.add_task(
                 "fetch_holidays",
                 self.calendar_manager.fetch_holidays,
+                group="visible_holidays",
                 year=self.displayed_year,
-                month=self.displayed_month
+                month=self.displayed_month,
+                force=force_refresh
             )
          
     def _setup_calendar_cell_dates(self, month_calendar):
@@ -884,6 +887,7 @@ class TodoApp(QMainWindow):
                 cell_data['current_state']['is_today'] = (current_date == today)
                 
                 if date_changed or today_changed:
+                    self.monthly_rendered = None
                     self.clear_widget(cell_data['tasks_container'])
                     cell_data['current_state']['tasks'] = []
                     cell_data['current_state']['holiday'] = None
@@ -945,16 +949,34 @@ class TodoApp(QMainWindow):
                 
         container_layout.insertWidget(0, holiday_frame)
         
-    def _update_calendar_cells(self, tasks_by_date, search_term=""):
-        """Update calendar cells with task data."""
+    def _update_monthly_dates(self, change, search_term=""):
+        """Refresh the cells of the changed days that are in the displayed month."""
+        month_start = datetime(self.displayed_year, self.displayed_month, 1).date()
+        month_end = month_start + timedelta(days=monthrange(self.displayed_year, self.displayed_month)[1] - 1)
+        visible = [day for day in change.dates if month_start <= day <= month_end]
+        if visible:
+            generation = self.calendar_manager.cache.get_generation()
+            tasks_by_date = generation.get_tasks_between_dates(min(visible), max(visible))
+            self._update_calendar_cells(tasks_by_date, search_term, only_dates=set(visible))
+            
+        rendered = self.monthly_rendered
+        if rendered and rendered[1:] == (search_term, self.displayed_year, self.displayed_month):
+            self.monthly_rendered = (max(rendered[0], change.generation),) + rendered[1:]
+        
+    def _update_calendar_cells(self, tasks_by_date, search_term="", only_dates=None):
+        """Update calendar cells with task data, or only the cells of only_dates."""
+        matching_ids = self.calendar_manager.cache.search_ids(search_term) if search_term else None
+        
         for cell_key, cell_data in self.calendar_cells.items():
             date = cell_data['current_state']['date']
             if not date or not cell_data['current_state']['is_current_month']:
                 continue
+            if only_dates is not None and date not in only_dates:
+                continue
                 
             tasks = tasks_by_date.get(date, [])
             if search_term:
-                tasks = [t for t in tasks if search_term.lower() in t.summary.lower()]
+                tasks = [t for t in tasks if t.task_id in matching_ids]
 
             container = cell_data['tasks_container']
             layout = container.layout()
@@ -1069,13 +1091,24 @@ class TodoApp(QMainWindow):
         
     def closeEvent(self, event):
         """Handle the window close event."""
+        self.worker.stop()
+        self.journal.stop()
+        self.cache_notifier.stop()
+        
+        store = self.calendar_manager.cache.store
+        if store:
+            try:
+                store.close()
+            except Exception as e:
+                print(f"Error flushing cache snapshot: {e}")
+                
         try:
-            if self.task_manager:
-                self.task_manager.stop_notification_check()
-            
             if self.reminder_manager:
                 self.reminder_manager.stop()
             
+            if self.task_manager:
+                self.task_manager.stop_notification_check()
+            
         except Exception as e:
             print(f"Error during shutdown: {e}")
             
@@ -1086,20 +1119,7 @@ class TodoApp(QMainWindow):
         today = datetime.now().date()
         
         if self.current_view == "daily":
-            month_key = (today.year, today.month)
-
-            if month_key in self.month_containers:
-                month_container = self.month_containers[month_key]['container']
-                
-                pos = month_container.pos().y()
-                self.daily_view.verticalScrollBar().setValue(pos)
-                
-                for widget in month_container.findChildren(QFrame):
-                    for child in widget.findChildren(QLabel):
-                        if child.text() == format_datetime(today, 'day') and pos > 0:
-                            day_pos = widget.pos().y() + pos
-                            self.daily_view.verticalScrollBar().setValue(day_pos)
-                            return
+            self.daily_view.scroll_to_date(today)
         
         elif self.current_view == "monthly":
             if today.year != self.displayed_year or today.month != self.displayed_month:
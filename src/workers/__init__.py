@@ -1,3 +1,6 @@
 from src.workers.api_worker import APIWorker
+from src.workers.write_journal import WriteJournal
+from src.workers.prefetcher import MonthPrefetcher
+from src.workers.cache_notifier import CacheChangeNotifier
 
-__all__ = ['APIWorker'] 
\ No newline at end of file
+__all__ = ['APIWorker', 'WriteJournal', 'MonthPrefetcher', 'CacheChangeNotifier'] 
\ No newline at end of file
@@ -1,57 +1,131 @@
-import queue
+import heapq
+import itertools
 import threading
-from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtCore import QObject, pyqtSignal
+from src.core.config import API_WORKER_THREADS
 
-class APIWorker(QThread):
-    """Worker thread for handling API calls without blocking the UI."""
+# Priority lanes, lowest value runs first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_VISIBLE = 1
+PRIORITY_PREFETCH = 2
+
+INTERACTIVE_TASK_TYPES = ['create_task', 'update_task', 'delete_task']
+BACKGROUND_TASK_TYPES = ['background_fetch', 'preload', 'prefetch']
+
+class APIWorker(QObject):
+    """Pool of worker threads for handling API calls without blocking the UI."""
     taskCompleted = pyqtSignal(object, object)
     taskError = pyqtSignal(Exception, object)
     loadingChanged = pyqtSignal(bool)
-    
-    def __init__(self, parent=None):
+
+    def __init__(self, parent=None, num_threads=API_WORKER_THREADS):
         super().__init__(parent)
-        self.queue = queue.Queue()
+        self.num_threads = max(1, num_threads)
+        self.queue = []
+        self.queue_lock = threading.Condition()
+        self.sequence = itertools.count()
+        self.latest_in_group = {}
+        self.threads = []
+        self.active_foreground = 0
         self.running = True
-        
-    def add_task(self, task_type, func, **kwargs):
-        """Add a task to the queue."""
-        self.queue.put((task_type, func, kwargs))
-            
-        if not self.isRunning():
-            self.start()
-    
+
+    def add_task(self, task_type, func, priority=None, group=None, **kwargs):
+        """Add a task to the queue and return its job id.
+        A task added with a group supersedes any still-queued task of the same group."""
+        if priority is None:
+            priority = self._default_priority(task_type)
+
+        with self.queue_lock:
+            job_id = next(self.sequence)
+            if group is not None:
+                self.latest_in_group[group] = job_id
+            heapq.heappush(self.queue, (priority, job_id, task_type, func, kwargs, group))
+            self.queue_lock.notify()
+
+        self._ensure_threads()
+        return job_id
+
+    def cancel_group(self, group):
+        """Drop every queued task of a group; tasks already running are left to finish."""
+        with self.queue_lock:
+            self.latest_in_group[group] = None
+
+    def _default_priority(self, task_type):
+        """Pick the priority lane for a task type."""
+        if task_type in INTERACTIVE_TASK_TYPES:
+            return PRIORITY_INTERACTIVE
+        if task_type in BACKGROUND_TASK_TYPES:
+            return PRIORITY_PREFETCH
+        return PRIORITY_VISIBLE
+
+    def _ensure_threads(self):
+        """Start the pool threads on first use."""
+        if self.threads:
+            return
+
+        for index in range(self.num_threads):
+            thread = threading.Thread(target=self.run, name=f"APIWorker-{index}", daemon=True)
+            self.threads.append(thread)
+            thread.start()
+
+    def _next_task(self):
+        """Pop the highest-priority task that has not been superseded, or None when stopping."""
+        with self.queue_lock:
+            while self.running:
+                while self.queue:
+                    priority, job_id, task_type, func, kwargs, group = heapq.heappop(self.queue)
+                    if group is not None and self.latest_in_group.get(group) != job_id:
+                        continue
+                    return task_type, func, kwargs
+                self.queue_lock.wait(0.5)
+        return None
+
+    def _set_foreground_active(self, delta):
+        """Track running foreground tasks and emit loadingChanged on the edges."""
+        with self.queue_lock:
+            was_loading = self.active_foreground > 0
+            self.active_foreground += delta
+            is_loading = self.active_foreground > 0
+
+        if was_loading != is_loading:
+            self.loadingChanged.emit(is_loading)
+
     def run(self):
         """Main worker loop that processes queued tasks."""
         while self.running:
             try:
+                task = self._next_task()
+                if task is None:
+                    break
+                task_type, func, kwargs = task
+
+                foreground = task_type not in BACKGROUND_TASK_TYPES
                 try:
-                    task_type, func, kwargs = self.queue.get(block=True, timeout=0.5)
-                except queue.Empty:
-                    continue
-                
-                try:
-                    if task_type not in ['background_fetch', 'preload']:
-                        self.loadingChanged.emit(True)
-                    
+                    if foreground:
+                        self._set_foreground_active(1)
+
                     result = func(**kwargs)
-                    
+
                     self.taskCompleted.emit(result, task_type)
-                    
+
                 except Exception as e:
                     print(f"Error in worker thread ({task_type}): {str(e)}")
                     self.taskError.emit(e, task_type)
-                
+
                 finally:
-                    if task_type not in ['background_fetch', 'preload']:
-                        self.loadingChanged.emit(False)
-                    self.queue.task_done()
-                    
+                    if foreground:
+                        self._set_foreground_active(-1)
+
             except Exception as e:
                 print(f"Unexpected error in worker thread: {str(e)}")
-                
+
         print("Worker thread stopped")
-                
+
     def stop(self):
-        """Stop the worker thread."""
-        self.running = False
-        self.wait(1000) 
\ No newline at end of file
+        """Stop the worker threads."""
+        with self.queue_lock:
+            self.running = False
+            self.queue_lock.notify_all()
+
+        for thread in self.threads:
+            thread.join(1.0)
@@ -0,0 +1,40 @@
+import threading
+from PyQt6.QtCore import QObject, pyqtSignal
+from src.api.cache import CacheChange
+
+class CacheChangeNotifier(QObject):
+    """Relays CacheManager change batches to the UI thread as a Qt signal.
+    Batches that arrive before the UI thread gets to the first are merged into one."""
+    cacheChanged = pyqtSignal(object)
+    changePending = pyqtSignal()
+
+    def __init__(self, cache, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.pending = None
+        self.pending_lock = threading.Lock()
+        self.changePending.connect(self._deliver)
+        self.cache.add_listener(self.on_change)
+
+    def on_change(self, change):
+        """Cache listener; may be called from any thread."""
+        with self.pending_lock:
+            first = self.pending is None
+            if first:
+                self.pending = CacheChange()
+            self.pending.merge(change)
+
+        if first:
+            self.changePending.emit()
+
+    def _deliver(self):
+        """Emit the merged change on the thread this object lives in."""
+        with self.pending_lock:
+            change, self.pending = self.pending, None
+
+        if change:
+            self.cacheChanged.emit(change)
+
+    def stop(self):
+        """Stop listening to the cache."""
+        self.cache.remove_listener(self.on_change)
@@ -0,0 +1,112 @@
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from src.core.config import PREFETCH_MONTHS, PREFETCH_MAX_MONTHS, PREFETCH_WINDOW_SECONDS, PREFETCH_MONTH_BUDGET
+from src.workers.api_worker import PRIORITY_PREFETCH
+
+class MonthPrefetcher:
+    """Loads the months around the visible one before the user navigates to them.
+    Looks further ahead in the direction of travel the faster the user is flipping, and
+    evicts the oldest unvisited prefetched months from memory once over budget."""
+    
+    def __init__(self, worker, calendar_manager, budget=PREFETCH_MONTH_BUDGET):
+        self.worker = worker
+        self.calendar_manager = calendar_manager
+        self.budget = budget
+        self.history = deque()
+        self.prefetched = OrderedDict()
+        self.queued_groups = set()
+        self.visible = None
+        
+    def month_shown(self, year, month):
+        """Record that a month is now on screen and queue prefetches around it."""
+        now = time.monotonic()
+        index = year * 12 + month - 1
+        self.visible = (year, month)
+        
+        # A prefetched month the user has reached is no longer speculative
+        self.prefetched.pop((year, month), None)
+        
+        self.history.append((now, index))
+        while len(self.history) > 1 and now - self.history[0][0] > PREFETCH_WINDOW_SECONDS:
+            self.history.popleft()
+            
+        ahead, behind = self._depths()
+        direction = self._direction()
+        
+        offsets = []
+        for distance in range(1, max(ahead, behind) + 1):
+            if distance <= ahead:
+                offsets.append(distance * (direction or 1))
+            if distance <= behind:
+                offsets.append(-distance * (direction or 1))
+                
+        wanted = set()
+        for offset in offsets:
+            wanted.add(self._queue(offset, index + offset))
+            
+        self._enforce_budget(wanted)
+        
+    def _direction(self):
+        """Get the direction of the last navigation: 1 forward, -1 back, 0 unknown."""
+        if len(self.history) < 2:
+            return 0
+        delta = self.history[-1][1] - self.history[-2][1]
+        return (delta > 0) - (delta < 0)
+        
+    def _depths(self):
+        """Get how many months to prefetch (ahead, behind) the direction of travel."""
+        if self._direction() == 0:
+            return PREFETCH_MONTHS, PREFETCH_MONTHS
+            
+        # Flips per second over the recent window
+        elapsed = self.history[-1][0] - self.history[0][0]
+        flips = len(self.history) - 1
+        velocity = flips / elapsed if elapsed > 0 else flips
+        
+        ahead = min(PREFETCH_MAX_MONTHS, PREFETCH_MONTHS + int(velocity))
+        return ahead, PREFETCH_MONTHS
+        
+    def _queue(self, offset, index):
+        """Queue a background load of one month unless it is already cached, returning its key.
+        Each offset has its own group, so navigating again supersedes stale queued loads."""
+        year, month = divmod(index, 12)
+        month += 1
+        month_key = (year, month)
+        if self.calendar_manager.cache.month_is_cached(year, month):
+            if month_key in self.prefetched:
+                self.prefetched.move_to_end(month_key)
+            return month_key
+            
+        self.prefetched[month_key] = True
+        self.prefetched.move_to_end(month_key)
+        self.queued_groups.add(("prefetch", offset))
+        self.worker.add_task(
+            "prefetch",
+            self.calendar_manager.get_events_for_month,
+            priority=PRIORITY_PREFETCH,
+            group=("prefetch", offset),
+            year=year,
+            month=month
+        )
+        return month_key
+        
+    def cancel(self):
+        """Drop the prefetches still queued, e.g. when the months they were for are no longer shown."""
+        for group in self.queued_groups:
+            self.worker.cancel_group(group)
+        self.queued_groups.clear()
+        
+    def _enforce_budget(self, wanted):
+        """Evict the oldest prefetched months over budget.
+        The visible month, today's month and the months just prefetched are never evicted."""
+        today = datetime.now().date()
+        pinned = {self.visible, (today.year, today.month)} | wanted
+        
+        for month_key in list(self.prefetched):
+            if len(self.prefetched) <= self.budget:
+                break
+            if month_key in pinned:
+                continue
+            del self.prefetched[month_key]
+            self.calendar_manager.cache.evict_month(*month_key)
@@ -0,0 +1,271 @@
+import threading
+import time
+from PyQt6.QtCore import QObject, pyqtSignal
+from src.core.config import DEFAULT_CALENDAR_ID, JOURNAL_RETRY_BASE_SECONDS, JOURNAL_RETRY_MAX_SECONDS
+from src.core.utils import generate_id, format_iso_for_api, parse_iso_from_api
+from src.core.models import Task
+
+TEMP_ID_PREFIX = 'local-'
+
+class WriteJournal(QObject):
+    """Write-behind journal for task edits.
+    Edits are applied to the cache at once and recorded in a durable journal; a background
+    thread replays them against the APIs in order, retrying while offline and rolling the
+    cache back when the server rejects an edit."""
+    operationCommitted = pyqtSignal(object)
+    operationFailed = pyqtSignal(object, Exception)
+    
+    def __init__(self, calendar_manager, task_manager=None, parent=None):
+        super().__init__(parent)
+        self.calendar_manager = calendar_manager
+        self.task_manager = task_manager
+        self.cache = calendar_manager.cache
+        self.store = self.cache.store
+        self.pending = []
+        self.pending_lock = threading.Condition()
+        self.running = True
+        
+        if self.store:
+            for op_id, entry in self.store.load_journal():
+                entry['op_id'] = op_id
+                self.pending.append(entry)
+        self.reapply_pending()
+        
+        self.thread = threading.Thread(target=self.run, name="WriteJournal", daemon=True)
+        self.thread.start()
+        
+    def create_event(self, event, calendar_id=DEFAULT_CALENDAR_ID):
+        """Create a calendar event optimistically and return its temporary ID."""
+        temp_id = TEMP_ID_PREFIX + generate_id()
+        optimistic = dict(event, id=temp_id)
+        self._submit({'kind': 'calendar', 'action': 'create', 'target_id': temp_id, 
+                      'calendar_id': calendar_id, 'body': event}, optimistic)
+        return temp_id
+        
+    def update_event(self, event_id, event, calendar_id=DEFAULT_CALENDAR_ID):
+        """Update a calendar event optimistically."""
+        optimistic = dict(event, id=event_id)
+        self._submit({'kind': 'calendar', 'action': 'update', 'target_id': event_id, 
+                      'calendar_id': calendar_id, 'body': event}, optimistic)
+        
+    def delete_event(self, event_id, calendar_id=DEFAULT_CALENDAR_ID):
+        """Delete a calendar event optimistically."""
+        self._submit({'kind': 'calendar', 'action': 'delete', 'target_id': event_id, 
+                      'calendar_id': calendar_id}, None)
+        
+    def create_task(self, task, tasklist_id='@default'):
+        """Create a Google Task optimistically and return its temporary ID."""
+        temp_id = TEMP_ID_PREFIX + generate_id()
+        self._submit({'kind': 'tasks', 'action': 'create', 'target_id': temp_id, 
+                      'tasklist_id': tasklist_id, 'body': self._task_body(task)}, 
+                     self._task_event_like(temp_id, task))
+        return temp_id
+        
+    def update_task(self, task_id, task, tasklist_id='@default'):
+        """Update a Google Task optimistically."""
+        self._submit({'kind': 'tasks', 'action': 'update', 'target_id': task_id, 
+                      'tasklist_id': tasklist_id, 'body': self._task_body(task)}, 
+                     self._task_event_like(task_id, task))
+        
+    def delete_task(self, task_id, tasklist_id='@default'):
+        """Delete a Google Task optimistically."""
+        self._submit({'kind': 'tasks', 'action': 'delete', 'target_id': task_id, 
+                      'tasklist_id': tasklist_id}, None)
+        
+    def _task_body(self, task):
+        """Get the JSON-serialisable fields of a Task needed to replay it."""
+        return {'summary': task.summary, 
+                'start': format_iso_for_api(task.start_dt), 
+                'end': format_iso_for_api(task.end_dt)}
+        
+    def _task_from_body(self, body, task_id=None):
+        """Rebuild the Task recorded by _task_body."""
+        return Task(body['summary'], parse_iso_from_api(body['start']), parse_iso_from_api(body['end']), 
+                    task_id=task_id, source='tasks', isAllDay=True)
+        
+    def _task_event_like(self, task_id, task):
+        """Build the cached event-like form of a Google Task."""
+        return {
+            'id': task_id,
+            'summary': task.summary,
+            'status': 'needs_action',
+            'start': {'dateTime': task.start_dt.isoformat()},
+            'end': {'dateTime': task.end_dt.isoformat()},
+            'source': 'tasks',
+            'isAllDay': True
+        }
+        
+    def _submit(self, entry, optimistic):
+        """Apply an edit to the cache, journal it and wake the flusher."""
+        record = self.cache.get_record(entry['target_id'])
+        entry['previous'] = record.event if record else None
+        entry['optimistic'] = optimistic
+        entry['attempts'] = 0
+        entry['next_attempt'] = 0
+        
+        self._apply_optimistic(entry)
+        
+        with self.pending_lock:
+            entry['op_id'] = self.store.append_journal(entry) if self.store else None
+            self.pending.append(entry)
+            self.pending_lock.notify()
+            
+    def _apply_optimistic(self, entry):
+        """Show the result of an edit in the cache before the server has seen it."""
+        if entry['action'] == 'delete':
+            self.cache.delete_event(entry['target_id'])
+        else:
+            self.cache.add_event(entry['optimistic'])
+            
+    def reapply_pending(self):
+        """Re-apply edits still waiting for the server, e.g. after a sync overwrote them."""
+        with self.pending_lock:
+            entries = list(self.pending)
+        for entry in entries:
+            self._apply_optimistic(entry)
+            
+    def has_pending(self):
+        """Check whether any edits are still waiting for the server."""
+        with self.pending_lock:
+            return bool(self.pending)
+            
+    def _next_entry(self):
+        """Wait for the oldest pending edit to be due, or return None when stopping."""
+        with self.pending_lock:
+            while self.running:
+                if self.pending:
+                    delay = self.pending[0]['next_attempt'] - time.time()
+                    if delay <= 0:
+                        return self.pending[0]
+                    self.pending_lock.wait(delay)
+                else:
+                    self.pending_lock.wait(0.5)
+        return None
+        
+    def run(self):
+        """Replay journaled edits in order."""
+        while self.running:
+            entry = self._next_entry()
+            if entry is None:
+                break
+                
+            try:
+                self._replay(entry)
+            except Exception as e:
+                if self._is_hard_failure(e, entry):
+                    print(f"Write rejected ({entry['kind']} {entry['action']}): {str(e)}")
+                    self._finish(entry)
+                    self._rollback(entry, e)
+                    self.operationFailed.emit(entry, e)
+                else:
+                    self._schedule_retry(entry, e)
+                continue
+                
+            self._finish(entry)
+            self.operationCommitted.emit(entry)
+            
+    def _replay(self, entry):
+        """Send one journaled edit to the API and settle the cache with the server's copy."""
+        action = entry['action']
+        target_id = entry['target_id']
+        
+        if entry['kind'] == 'calendar':
+            calendar_id = entry['calendar_id']
+            if action == 'create':
+                entry['result'] = self.calendar_manager.add_event(calendar_id, entry['body'])
+            elif action == 'update':
+                entry['result'] = self.calendar_manager.update_event(calendar_id, target_id, entry['body'])
+            else:
+                self._delete_ignoring_missing(self.calendar_manager.delete_event, calendar_id, target_id)
+                entry['result'] = None
+        else:
+            if not self.task_manager:
+                raise RuntimeError("Task manager not available")
+            tasklist_id = entry['tasklist_id']
+            if action == 'create':
+                entry['result'] = self.task_manager.add_task(tasklist_id, self._task_from_body(entry['body']))
+            elif action == 'update':
+                entry['result'] = self.task_manager.update_task(
+                    tasklist_id, target_id, self._task_from_body(entry['body'], target_id))
+            else:
+                self._delete_ignoring_missing(self.task_manager.delete_task, tasklist_id, target_id)
+                entry['result'] = None
+                
+        if action == 'create':
+            self.cache.delete_event(target_id)
+            self._remap_id(target_id, entry['result']['id'])
+            
+    def _delete_ignoring_missing(self, delete, container_id, target_id):
+        """Delete on the server, treating an item that is already gone as deleted."""
+        try:
+            delete(container_id, target_id)
+        except Exception as e:
+            if self._http_status(e) not in (404, 410):
+                raise
+                
+    def _remap_id(self, temp_id, real_id):
+        """Point later edits of a just-created item at its server ID."""
+        with self.pending_lock:
+            for entry in self.pending[1:]:
+                if entry['target_id'] == temp_id:
+                    entry['target_id'] = real_id
+                    if entry['optimistic']:
+                        entry['optimistic']['id'] = real_id
+                    if entry['previous']:
+                        entry['previous'] = dict(entry['previous'], id=real_id)
+                    if self.store:
+                        self.store.update_journal(entry['op_id'], entry)
+                        
+    def _finish(self, entry):
+        """Remove a settled edit from the journal."""
+        with self.pending_lock:
+            self.pending = [e for e in self.pending if e is not entry]
+        if self.store and entry['op_id'] is not None:
+            self.store.remove_journal(entry['op_id'])
+            
+    def _rollback(self, entry, error):
+        """Restore the cache to its state before a rejected edit.
+        An item the server no longer has (404 or 410) is dropped instead of restored. Later edits
+        of it, or of an item whose creation was rejected, can never succeed, so they are dropped too."""
+        gone = entry['action'] != 'create' and self._http_status(error) in (404, 410)
+        if entry['previous'] and not gone:
+            self.cache.add_event(entry['previous'])
+        else:
+            self.cache.delete_event(entry['target_id'])
+            
+        if entry['action'] == 'create' or gone:
+            with self.pending_lock:
+                orphans = [e for e in self.pending if e['target_id'] == entry['target_id']]
+            for orphan in orphans:
+                self._finish(orphan)
+                
+    def _schedule_retry(self, entry, error):
+        """Back off exponentially before retrying an edit that failed transiently."""
+        entry['attempts'] += 1
+        delay = min(JOURNAL_RETRY_BASE_SECONDS * (2 ** (entry['attempts'] - 1)), JOURNAL_RETRY_MAX_SECONDS)
+        entry['next_attempt'] = time.time() + delay
+        print(f"Write failed ({entry['kind']} {entry['action']}), retrying in {delay}s: {str(error)}")
+        if self.store and entry['op_id'] is not None:
+            self.store.update_journal(entry['op_id'], entry)
+            
+    def _http_status(self, error):
+        """Get the HTTP status of an API error, or None for transport errors."""
+        status = getattr(getattr(error, 'resp', None), 'status', None)
+        try:
+            return int(status) if status is not None else None
+        except (TypeError, ValueError):
+            return None
+            
+    def _is_hard_failure(self, error, entry):
+        """Check whether the server rejected an edit outright, as opposed to being unreachable."""
+        if isinstance(error, (KeyError, TypeError, ValueError, RuntimeError)):
+            return True
+        status = self._http_status(error)
+        return status is not None and 400 <= status < 500 and status not in (401, 408, 429)
+        
+    def stop(self):
+        """Stop the flusher; unsent edits stay in the journal for the next run."""
+        with self.pending_lock:
+            self.running = False
+            self.pending_lock.notify_all()
+        self.thread.join(1.0)
@@ -0,0 +1,97 @@
+from datetime import date
+
+from src.api.cache import CacheManager
+from src.api.store import CacheStore
+
+def month_offset(offset):
+    today = date.today()
+    year, month_index = divmod(today.year * 12 + today.month - 1 + offset, 12)
+    return year, month_index + 1
+
+def make_event(event_id, year, month):
+    return {
+        'id': event_id,
+        'summary': event_id,
+        'start': {'date': date(year, month, 10).isoformat()},
+        'end': {'date': date(year, month, 11).isoformat()}
+    }
+
+def fill_months(cache, offsets):
+    """Fetch one event into each month, in order, and return the month keys."""
+    month_keys = [month_offset(offset) for offset in offsets]
+    for month_key in month_keys:
+        cache.replace_month(*month_key, [make_event(f"event-{month_key}", *month_key)])
+    return month_keys
+
+def test_least_recently_used_months_are_evicted_but_kept_on_disk(tmp_path):
+    store = CacheStore(str(tmp_path / "cache.db"))
+    cache = CacheManager(store=store, max_months=2)
+    changes = []
+    cache.add_listener(changes.append)
+
+    oldest, middle, newest = fill_months(cache, [10, 11, 12])
+
+    assert not cache.month_is_cached(*oldest)
+    assert cache.month_is_cached(*middle) and cache.month_is_cached(*newest)
+    assert f"event-{oldest}" in changes[-1].evicted
+    assert not changes[-1].removed
+
+    # Restoring reads the month back from disk as snapshot data and evicts the next one in line
+    assert cache.restore_month(*oldest)
+    assert cache.has_event_id(f"event-{oldest}")
+    assert oldest in cache.get_snapshot_months()
+    assert not cache.month_is_cached(*middle)
+    store.close()
+
+def test_reading_a_month_keeps_it_from_being_evicted():
+    cache = CacheManager(max_months=2)
+    first, second = fill_months(cache, [10, 11])
+
+    cache.get_events_for_month(*first)
+    (third,) = fill_months(cache, [12])
+
+    assert cache.month_is_cached(*first)
+    assert not cache.month_is_cached(*second)
+    assert cache.month_is_cached(*third)
+
+def test_pinned_months_survive_eviction():
+    cache = CacheManager(max_months=1)
+    first, = fill_months(cache, [10])
+    cache.pin_months([first])
+
+    second, = fill_months(cache, [11])
+
+    assert cache.month_is_cached(*first)
+    assert not cache.month_is_cached(*second)
+
+def test_restore_month_needs_a_complete_stored_month(tmp_path):
+    store = CacheStore(str(tmp_path / "cache.db"))
+    cache = CacheManager(store=store)
+    partial = month_offset(10)
+    cache.add_event(make_event('picked-up', *partial))
+    cache.evict_month(*partial)
+
+    assert not cache.restore_month(*partial)
+    assert not cache.has_event_id('picked-up')
+    store.close()
+
+def test_startup_loads_nearby_months_and_defers_the_rest(tmp_path):
+    path = str(tmp_path / "cache.db")
+    store = CacheStore(path)
+    writer = CacheManager(store=store)
+    today, near, far, refetched = fill_months(writer, [0, 1, 6, 7])
+    store.close()
+
+    store = CacheStore(path)
+    cache = CacheManager(store=store)
+    assert cache.has_event_id(f"event-{today}") and cache.has_event_id(f"event-{near}")
+    assert not cache.has_event_id(f"event-{far}")
+
+    # A month fetched before the deferred load gets to it is not overwritten from disk
+    cache.replace_month(*refetched, [])
+    assert cache.load_deferred_snapshot() == 1
+
+    assert cache.has_event_id(f"event-{far}")
+    assert not cache.has_event_id(f"event-{refetched}")
+    assert far in cache.get_snapshot_months()
+    store.close()
@@ -0,0 +1,119 @@
+from datetime import date, datetime, timedelta
+
+from src.api.cache import CacheManager, TIME_INDEX_BISECT_LIMIT
+
+def timed_event(event_id, start, hours=1):
+    """Build a timed event starting at a naive local datetime."""
+    start = start.astimezone()
+    return {
+        'id': event_id,
+        'summary': event_id,
+        'start': {'dateTime': start.isoformat()},
+        'end': {'dateTime': (start + timedelta(hours=hours)).isoformat()}
+    }
+
+def all_day_event(event_id, first_day, days=1):
+    return {
+        'id': event_id,
+        'summary': event_id,
+        'start': {'date': first_day.isoformat()},
+        'end': {'date': (first_day + timedelta(days=days)).isoformat()}
+    }
+
+def ids(events):
+    return [event['id'] for event in events]
+
+def task_ids(tasks_by_date):
+    return {day: sorted(task.task_id for task in tasks) for day, tasks in tasks_by_date.items()}
+
+def assert_time_index_consistent(cache):
+    assert cache.time_index == sorted((record.start_ts, event_id) for event_id, record in cache.records.items())
+
+def test_events_between_are_ordered_by_start_and_bounds_are_inclusive():
+    cache = CacheManager()
+    base = datetime(2026, 3, 10, 9, 0)
+    cache.add_events([timed_event('late', base + timedelta(hours=5)), timed_event('early', base),
+                      timed_event('middle', base + timedelta(hours=2)), timed_event('outside', base + timedelta(days=3))])
+
+    found = cache.get_events_between(base.astimezone(), (base + timedelta(hours=5)).astimezone())
+
+    assert ids(found) == ['early', 'middle', 'late']
+
+def test_time_index_follows_moves_and_deletes_in_small_and_large_batches():
+    cache = CacheManager()
+    base = datetime(2026, 3, 1, 8, 0)
+    count = TIME_INDEX_BISECT_LIMIT * 3
+    cache.add_events([timed_event(f"e{i}", base + timedelta(hours=i)) for i in range(count)])
+    assert_time_index_consistent(cache)
+
+    # A small batch bisects, a large one rebuilds with a single sort
+    cache.apply_delta([timed_event('e0', base + timedelta(days=20))], ['e1'])
+    assert_time_index_consistent(cache)
+    cache.apply_delta([timed_event(f"e{i}", base - timedelta(hours=i)) for i in range(2, count, 2)],
+                      [f"e{i}" for i in range(3, count, 2)])
+    assert_time_index_consistent(cache)
+
+    day_start = datetime(2026, 3, 21).astimezone()
+    assert ids(cache.get_events_between(day_start, day_start + timedelta(days=1))) == ['e0']
+
+def test_move_within_one_batch_leaves_a_single_index_entry():
+    cache = CacheManager()
+    start = datetime(2026, 3, 5, 12, 0)
+    cache.apply_delta([timed_event('moved', start), timed_event('moved', start + timedelta(days=1)),
+                       timed_event('moved', start)], [])
+
+    assert [event_id for _, event_id in cache.time_index] == ['moved']
+    assert_time_index_consistent(cache)
+
+def test_tasks_between_lists_multi_day_events_on_every_day():
+    cache = CacheManager()
+    cache.add_events([all_day_event('trip', date(2026, 3, 9), days=5), all_day_event('single', date(2026, 3, 11))])
+
+    found = cache.get_tasks_between(datetime(2026, 3, 10).astimezone(), datetime(2026, 3, 12, 23, 59).astimezone())
+
+    assert task_ids(found) == {
+        date(2026, 3, 10): ['trip'],
+        date(2026, 3, 11): ['single', 'trip'],
+        date(2026, 3, 12): ['trip']
+    }
+
+def test_generation_lists_tasks_by_start_date_and_by_overlapped_day():
+    cache = CacheManager()
+    cache.add_events([all_day_event('trip', date(2026, 3, 30), days=4), all_day_event('single', date(2026, 4, 1))])
+    generation = cache.get_generation()
+
+    assert [task.task_id for task in generation.get_tasks_for_date(date(2026, 3, 30))] == ['trip']
+    assert generation.get_tasks_for_date(date(2026, 3, 31)) == ()
+    assert task_ids(generation.get_tasks_by_date()) == {date(2026, 3, 30): ['trip'], date(2026, 4, 1): ['single']}
+    assert task_ids(generation.get_tasks_between_dates(date(2026, 3, 31), date(2026, 4, 2))) == {
+        date(2026, 3, 31): ['trip'],
+        date(2026, 4, 1): ['single', 'trip'],
+        date(2026, 4, 2): ['trip']
+    }
+
+def test_new_generation_shares_untouched_months_and_leaves_the_old_one_unchanged():
+    cache = CacheManager()
+    cache.add_events([all_day_event('march', date(2026, 3, 3)), all_day_event('may', date(2026, 5, 5))])
+    before = cache.get_generation()
+
+    cache.add_event(all_day_event('march-2', date(2026, 3, 4)))
+    after = cache.get_generation()
+
+    assert after.number == before.number + 1
+    assert after.starting_by_month[(2026, 5)] is before.starting_by_month[(2026, 5)]
+    assert after.overlapping_by_month[(2026, 5)] is before.overlapping_by_month[(2026, 5)]
+    assert before.get_tasks_for_date(date(2026, 3, 4)) == ()
+    assert [task.task_id for task in after.get_tasks_for_date(date(2026, 3, 4))] == ['march-2']
+
+def test_deleting_the_last_task_of_a_day_or_month_drops_it_from_the_indexes():
+    cache = CacheManager()
+    cache.add_events([all_day_event('only', date(2026, 6, 15), days=2)])
+
+    cache.delete_event('only')
+    generation = cache.get_generation()
+
+    assert cache.get_tasks_for_date(date(2026, 6, 15)) == []
+    assert (2026, 6) not in generation.starting_by_month
+    assert (2026, 6) not in generation.overlapping_by_month
+    assert cache.day_ids == {}
+    assert cache.time_index == []
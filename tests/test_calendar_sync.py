@@ -0,0 +1,89 @@
+import datetime
+
+from src.api.cache import CacheManager
+from src.api.calendar import CalendarManager
+from src.api.store import CacheStore
+
+class FakeHttpError(Exception):
+    """Stand-in for googleapiclient's HttpError, which carries the response status."""
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.resp = type('Response', (), {'status': status})()
+
+class FakeRequest:
+    def __init__(self, respond):
+        self.headers = {}
+        self.respond = respond
+
+    def execute(self):
+        return self.respond()
+
+class FakeEventsResource:
+    """Serves events().list() from a canned full listing and rejects every sync token."""
+    def __init__(self, items):
+        self.items = items
+        self.calls = []
+
+    def list(self, **params):
+        self.calls.append(params)
+        if 'syncToken' in params:
+            def respond():
+                raise FakeHttpError(410)
+        else:
+            def respond():
+                return {'items': self.items, 'nextSyncToken': 'fresh-token'}
+        return FakeRequest(respond)
+
+class FakeAuthManager:
+    def __init__(self, events):
+        self.events = events
+
+    def refresh_token_if_needed(self):
+        pass
+
+    def get_service(self, name, version):
+        return type('Service', (), {'events': lambda service: self.events})()
+
+def month_offset(offset):
+    today = datetime.date.today()
+    year, month_index = divmod(today.year * 12 + today.month - 1 + offset, 12)
+    return year, month_index + 1
+
+def make_event(event_id, year, month):
+    return {
+        'id': event_id,
+        'summary': event_id,
+        'start': {'dateTime': f"{year}-{month:02d}-10T12:00:00Z"},
+        'end': {'dateTime': f"{year}-{month:02d}-10T13:00:00Z"}
+    }
+
+def test_expired_sync_token_falls_back_to_bounded_full_sync(tmp_path):
+    this_month, last_month = month_offset(0), month_offset(-1)
+    store = CacheStore(str(tmp_path / "cache.db"))
+    cache = CacheManager(store=store)
+    cache.add_events([make_event('kept', *this_month), make_event('deleted-here', *this_month),
+                      make_event('deleted-on-disk', *last_month)])
+    cache.mark_range_fetched(*last_month)
+    cache.set_sync_token('primary', 'old-token')
+    # Only the store still holds last month's events
+    cache.evict_month(*last_month)
+
+    resource = FakeEventsResource([make_event('kept', *this_month), make_event('new', *this_month)])
+    manager = CalendarManager(FakeAuthManager(resource), cache)
+
+    result = manager.sync_events('primary')
+
+    assert result['full_sync'] is True
+    assert resource.calls[0]['syncToken'] == 'old-token'
+    listing = resource.calls[1]
+    assert 'syncToken' not in listing
+    assert listing['timeMin'] < listing['timeMax']
+    assert cache.get_sync_token('primary') == 'fresh-token'
+
+    assert cache.has_event_id('kept') and cache.has_event_id('new')
+    assert not cache.has_event_id('deleted-here')
+
+    # A deleted event must not come back when its evicted month is read from disk again
+    assert cache.restore_month(*last_month)
+    assert not cache.has_event_id('deleted-on-disk')
+    store.close()
@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+
+from src.api.inflight import SingleFlight
+
+def run_concurrently(flight, key, func, callers):
+    """Call flight.do(key, func) from several threads; return their results or exceptions."""
+    results = [None] * callers
+
+    def call(index):
+        try:
+            results[index] = flight.do(key, func)
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+def test_concurrent_calls_for_one_key_share_a_single_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(2.0)
+        return 'events'
+
+    threads, results = run_concurrently(flight, 'march', fetch, 5)
+    wait_for(lambda: calls)
+    # Give the other callers time to join the call in flight
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(2.0)
+
+    assert len(calls) == 1
+    assert results == ['events'] * 5
+
+def test_an_error_reaches_every_waiter_and_the_key_is_freed():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait(2.0)
+        raise RuntimeError("offline")
+
+    threads, results = run_concurrently(flight, 'march', fail, 3)
+    wait_for(lambda: 'march' in flight.calls)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(2.0)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.do('march', lambda: 'retried') == 'retried'
+
+def test_sequential_calls_are_not_coalesced():
+    flight = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return len(calls)
+
+    assert flight.do('march', fetch) == 1
+    assert flight.do('march', fetch) == 2
+
+def test_claim_hands_out_only_keys_not_already_in_flight():
+    flight = SingleFlight()
+    owned, futures = flight.claim(['march', 'april'])
+    assert owned == ['march', 'april'] and futures == []
+
+    owned_later, waiting = flight.claim(['april', 'may'])
+    assert owned_later == ['may']
+    assert len(waiting) == 1
+
+    flight.resolve(owned, result='done')
+    assert waiting[0].result(timeout=1.0) == 'done'
+    may_owned, may_waiting = flight.claim(['may'])
+    assert may_owned == [] and len(may_waiting) == 1
+    flight.resolve(owned_later, error=RuntimeError("offline"))
+    with pytest.raises(RuntimeError):
+        may_waiting[0].result(timeout=1.0)
+    assert flight.claim(['may']) == (['may'], [])
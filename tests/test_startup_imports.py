@@ -0,0 +1,31 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Importing the API layer must stay cheap; the Google client is loaded by the first request
+IMPORT_BUDGET_SECONDS = 0.5
+
+IMPORT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import src.api.auth, src.api.calendar, src.api.tasks
+elapsed = time.perf_counter() - started
+heavy = sorted(name for name in sys.modules if name.startswith(('google', 'httplib2')))
+print(json.dumps({'elapsed': elapsed, 'heavy': heavy}))
+"""
+
+def run_import_script():
+    """Import the API modules in a fresh interpreter and report what it cost."""
+    result = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], cwd=REPO_ROOT,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_api_import_does_not_load_google_libraries():
+    assert run_import_script()['heavy'] == []
+
+def test_api_import_within_budget():
+    elapsed = run_import_script()['elapsed']
+    assert elapsed < IMPORT_BUDGET_SECONDS, f"importing the API layer took {elapsed:.3f}s"
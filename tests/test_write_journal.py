@@ -0,0 +1,168 @@
+import threading
+import time
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip("PyQt6")
+
+from src.api.cache import CacheManager
+from src.api.store import CacheStore
+from src.workers.write_journal import WriteJournal, TEMP_ID_PREFIX
+
+class FakeHttpError(Exception):
+    """Stand-in for googleapiclient's HttpError, which carries the response status."""
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.resp = type('Response', (), {'status': status})()
+
+class FakeCalendarManager:
+    """Answers the journal's calendar calls like CalendarManager, without a network.
+    Every call waits for the gate, so edits can be queued before the first one is sent."""
+    def __init__(self, cache, error=None):
+        self.cache = cache
+        self.error = error
+        self.gate = threading.Event()
+        self.gate.set()
+        self.calls = []
+        self.next_id = 1
+
+    def _call(self, action, event_id):
+        self.gate.wait(2.0)
+        self.calls.append((action, event_id))
+        if self.error is not None:
+            raise self.error
+
+    def add_event(self, calendar_id, event):
+        self._call('create', None)
+        result = dict(event, id=f"server-{self.next_id}")
+        self.next_id += 1
+        self.cache.add_event(result)
+        return result
+
+    def update_event(self, calendar_id, event_id, event):
+        self._call('update', event_id)
+        result = dict(event, id=event_id)
+        self.cache.add_event(result)
+        return result
+
+    def delete_event(self, calendar_id, event_id):
+        self._call('delete', event_id)
+        self.cache.delete_event(event_id)
+
+def make_event(summary):
+    # This month, so the store restores it at startup rather than in the deferred load
+    day = date.today().replace(day=10)
+    return {
+        'summary': summary,
+        'start': {'date': day.isoformat()},
+        'end': {'date': (day + timedelta(days=1)).isoformat()}
+    }
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+@pytest.fixture
+def cache(tmp_path):
+    store = CacheStore(str(tmp_path / "cache.db"))
+    yield CacheManager(store=store)
+    store.close()
+
+def cached_summary(cache, event_id):
+    record = cache.get_record(event_id)
+    return record.summary if record else None
+
+def test_edits_of_a_new_event_follow_it_to_its_server_id(cache):
+    server = FakeCalendarManager(cache)
+    server.gate.clear()
+    journal = WriteJournal(server)
+
+    temp_id = journal.create_event(make_event('draft'))
+    journal.update_event(temp_id, make_event('final'))
+    assert temp_id.startswith(TEMP_ID_PREFIX)
+    assert cached_summary(cache, temp_id) == 'final'
+
+    server.gate.set()
+    wait_for(lambda: not journal.has_pending())
+    journal.stop()
+
+    assert server.calls == [('create', None), ('update', 'server-1')]
+    assert not cache.has_event_id(temp_id)
+    assert cached_summary(cache, 'server-1') == 'final'
+    assert cache.store.load_journal() == []
+
+def test_rejected_create_is_rolled_back_with_its_later_edits(cache):
+    server = FakeCalendarManager(cache, error=FakeHttpError(400))
+    server.gate.clear()
+    journal = WriteJournal(server)
+
+    temp_id = journal.create_event(make_event('draft'))
+    journal.update_event(temp_id, make_event('final'))
+    server.gate.set()
+    wait_for(lambda: not journal.has_pending())
+    journal.stop()
+
+    assert server.calls == [('create', None)]
+    assert not cache.has_event_id(temp_id)
+    assert cache.store.load_journal() == []
+
+def test_rejected_update_restores_the_previous_copy(cache):
+    cache.add_event(dict(make_event('original'), id='event-1'))
+    journal = WriteJournal(FakeCalendarManager(cache, error=FakeHttpError(400)))
+
+    journal.update_event('event-1', make_event('edited'))
+    wait_for(lambda: cached_summary(cache, 'event-1') == 'original')
+    journal.stop()
+
+@pytest.mark.parametrize("status", [404, 410])
+def test_update_of_an_event_gone_from_the_server_drops_it(cache, status):
+    cache.add_event(dict(make_event('original'), id='event-1'))
+    server = FakeCalendarManager(cache, error=FakeHttpError(status))
+    server.gate.clear()
+    journal = WriteJournal(server)
+
+    journal.update_event('event-1', make_event('edited'))
+    journal.update_event('event-1', make_event('edited again'))
+    server.gate.set()
+    wait_for(lambda: not cache.has_event_id('event-1') and not journal.has_pending())
+    journal.stop()
+
+    assert server.calls == [('update', 'event-1')]
+
+def test_delete_of_an_event_already_gone_counts_as_done(cache):
+    cache.add_event(dict(make_event('original'), id='event-1'))
+    journal = WriteJournal(FakeCalendarManager(cache, error=FakeHttpError(404)))
+
+    journal.delete_event('event-1')
+    assert not cache.has_event_id('event-1')
+    wait_for(lambda: not journal.has_pending())
+    journal.stop()
+
+    assert not cache.has_event_id('event-1')
+
+def test_pending_edits_are_replayed_after_a_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+    store = CacheStore(path)
+    cache = CacheManager(store=store)
+    # Stopped before it sends anything, as if the app quit while offline
+    journal = WriteJournal(FakeCalendarManager(cache))
+    journal.stop()
+    temp_id = journal.create_event(make_event('offline'))
+    store.close()
+
+    store = CacheStore(path)
+    cache = CacheManager(store=store)
+    assert cached_summary(cache, temp_id) == 'offline'
+
+    server = FakeCalendarManager(cache)
+    journal = WriteJournal(server)
+    wait_for(lambda: not journal.has_pending())
+    journal.stop()
+
+    assert server.calls == [('create', None)]
+    assert not cache.has_event_id(temp_id)
+    assert cached_summary(cache, 'server-1') == 'offline'
+    store.close()